@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+
+SCRIPT_SOLUTION = "#!/bin/sh\nexec cat\n"
+SCRIPT_GENERATOR = "#!/bin/sh\necho 1 2\n"
+CONFIG = {"languages": [{"name": "Shell", "extension": ".sh"}]}
+
+
+def write_script(path, content):
+    with open(path, "w") as file:
+        file.write(content)
+    os.chmod(path, 0o755)
+
+
+def prepare(workDir, tests):
+    home = os.path.join(workDir, "home")
+    os.makedirs(os.path.join(home, ".config", "hazmat"))
+    with open(os.path.join(home, ".config", "hazmat", "hazmat.json"), "w") as file:
+        json.dump(CONFIG, file)
+    os.environ["HOME"] = home
+
+    os.chdir(workDir)
+    write_script("sol.sh", SCRIPT_SOLUTION)
+    write_script("brute.sh", SCRIPT_SOLUTION)
+    write_script("gen.sh", SCRIPT_GENERATOR)
+    os.makedirs("Tests")
+    os.makedirs("Generated")
+    for index in range(tests):
+        for extension in (".in", ".out"):
+            with open("Tests/{}{}".format(index, extension), "w") as file:
+                file.write("{} {}\n".format(index, index + 1))
+
+
+def measure(function, ops):
+    start = time.perf_counter()
+    for _ in range(ops):
+        function()
+    seconds = time.perf_counter() - start
+    return {"ops": ops, "seconds": seconds, "per_op_us": seconds / ops * 1e6}
+
+
+def quiet(function):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return function()
+
+
+def run_command(argv):
+    from hazmat.options import OptionsDispacher
+    dispatcher = OptionsDispacher(argv)
+    args = vars(dispatcher.parser.parse_args(argv))
+    start = time.perf_counter()
+    quiet(lambda: args["func"](args))
+    return time.perf_counter() - start
+
+
+def phases(ops):
+    from hazmat.models import Solution, Validator
+    from hazmat.output import strAC
+    from hazmat.models.usage import Usage
+    from hazmat import tmp_utils
+
+    solution = Solution(name = "sol.sh", timeout = 5)
+    builtin = Validator()
+    diff = Validator(checker = "diff", flags = ["-wq"])
+    tmp = tmp_utils.create()
+    solution.run("Tests/0.in", tmp)
+    usage = Usage(wall = 0.01, cpu = 0.01)
+
+    def raw_spawn():
+        with open("Tests/0.in") as stdin, open(tmp, "w") as stdout:
+            subprocess.call(["./sol.sh"], stdin = stdin, stdout = stdout)
+
+    result = {
+        "raw_spawn": measure(raw_spawn, ops),
+        "solution_run": measure(lambda: solution.run("Tests/0.in", tmp), ops),
+        "validate_builtin": measure(lambda: builtin.validate("Tests/0.in", "Tests/0.out", tmp), ops),
+        "validate_diff": measure(lambda: diff.validate("Tests/0.in", "Tests/0.out", tmp), ops),
+        "format_ac": measure(lambda: strAC("Tests/0.in", usage), ops * 100),
+    }
+    result["solution_run_overhead_us"] = result["solution_run"]["per_op_us"] - result["raw_spawn"]["per_op_us"]
+
+    try:
+        from hazmat.progressbar import tqdm
+        with open(os.devnull, "w") as devnull:
+            bar = tqdm(total = ops * 100, file = devnull, mininterval = 0)
+            result["progressbar_update"] = measure(bar.update, ops * 100)
+            bar.close()
+    except Exception as error:
+        result["progressbar_update"] = {"error": repr(error)}
+    return result
+
+
+def end_to_end(tests, iterations, jobs):
+    report = {}
+    for mode, modeJobs in (("serial", 1), ("parallel", jobs)):
+        seconds = run_command(["test", "sol.sh", "-j", str(modeJobs), "--print-level", "0", "--no-cache"])
+        report.setdefault("test", {})[mode] = {"jobs": modeJobs, "seconds": seconds, "per_sec": tests / seconds}
+
+        seconds = run_command(["live", "sol.sh", "brute.sh", "-gen", "./gen.sh", "-n", str(iterations), "-j", str(modeJobs), "--print-level", "0"])
+        report.setdefault("live", {})[mode] = {"jobs": modeJobs, "seconds": seconds, "per_sec": iterations / seconds}
+
+        seconds = run_command(["generate", "sol.sh", "--generator", "./gen.sh", "--prefix", mode, "--range", "0", str(iterations), "--dir", "Generated", "-j", str(modeJobs)])
+        report.setdefault("generate", {})[mode] = {"jobs": modeJobs, "seconds": seconds, "per_sec": iterations / seconds}
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description = "Measure hazmat's own per-test overhead")
+    parser.add_argument("--tests", type = int, default = 200, help = "Number of synthetic tests")
+    parser.add_argument("--iterations", type = int, default = 200, help = "Iterations of live and generate")
+    parser.add_argument("--ops", type = int, default = 200, help = "Repetitions of every phase")
+    parser.add_argument("--jobs", "-j", type = int, default = os.cpu_count() or 1, help = "Workers of parallel runs")
+    parser.add_argument("--output", "-o", default = "-", help = "JSON report path, - for stdout")
+    args = parser.parse_args()
+
+    output = args.output
+    if output != "-":
+        output = os.path.abspath(output)
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+    with tempfile.TemporaryDirectory(prefix = "hazmat-bench-") as workDir:
+        prepare(workDir, args.tests)
+        from hazmat import tmp_utils
+        try:
+            report = {
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "cpus": os.cpu_count(),
+                "phases": phases(args.ops),
+                "end_to_end": end_to_end(args.tests, args.iterations, args.jobs),
+            }
+        finally:
+            tmp_utils.clear_up()
+
+    text = json.dumps(report, indent = 2)
+    if output == "-":
+        print(text)
+    else:
+        with open(output, "w") as file:
+            file.write(text + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+import argparse
+import json
+import os
+import sys
+import time
+from subprocess import DEVNULL
+
+
+def rate(function, runs):
+    start = time.perf_counter()
+    for _ in range(runs):
+        function()
+    return runs / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description = "Measure process spawns per second of hazmat launchers")
+    parser.add_argument("--runs", type = int, default = 500, help = "Spawns per launcher and round")
+    parser.add_argument("--rounds", type = int, default = 5, help = "Alternating rounds, the best one is reported")
+    parser.add_argument("--program", default = "/bin/true", help = "Program to spawn")
+    parser.add_argument("--output", "-o", default = "-", help = "JSON report path, - for stdout")
+    args = parser.parse_args()
+
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from hazmat import process
+
+    def popen():
+        proc = process.spawn([args.program], stdin = DEVNULL, stdout = DEVNULL, stderr = DEVNULL)
+        proc.wait()
+        process.release(proc)
+
+    def posix_spawn():
+        process.call([args.program], stdin = DEVNULL, stdout = DEVNULL, stderr = DEVNULL)
+
+    launchers = {"popen": popen, "posix_spawn": posix_spawn}
+    best = {name: 0.0 for name in launchers}
+    for _ in range(args.rounds):
+        for name, function in launchers.items():
+            best[name] = max(best[name], rate(function, args.runs))
+
+    report = {"program": args.program, "runs": args.runs, "rounds": args.rounds, "spawns_per_sec": best}
+    report["speedup"] = report["spawns_per_sec"]["posix_spawn"] / report["spawns_per_sec"]["popen"]
+
+    text = json.dumps(report, indent = 2)
+    if args.output == "-":
+        print(text)
+    else:
+        with open(args.output, "w") as file:
+            file.write(text + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+COMMANDS = [[], ["run", "--help"], ["test", "--help"], ["live", "--help"], ["build", "--help"]]
+
+
+def measure(command, runs, env):
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(command, stdout = subprocess.DEVNULL, stderr = subprocess.DEVNULL, env = env, check = False)
+        samples.append(time.perf_counter() - start)
+    return {"median_ms": statistics.median(samples) * 1000, "min_ms": min(samples) * 1000}
+
+
+def main():
+    parser = argparse.ArgumentParser(description = "Measure hazmat command line startup time")
+    parser.add_argument("--runs", type = int, default = 20, help = "Runs of every command")
+    parser.add_argument("--output", "-o", default = "-", help = "JSON report path, - for stdout")
+    args = parser.parse_args()
+
+    env = dict(os.environ)
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env["PYTHONPATH"] = root + os.pathsep + env.get("PYTHONPATH", "")
+
+    report = {
+        "python": measure([sys.executable, "-c", "pass"], args.runs, env),
+        "commands": {" ".join(["hazmat"] + argv): measure([sys.executable, "-m", "hazmat"] + argv, args.runs, env) for argv in COMMANDS},
+    }
+
+    text = json.dumps(report, indent = 2)
+    if args.output == "-":
+        print(text)
+    else:
+        with open(args.output, "w") as file:
+            file.write(text + "\n")
+
+
+if __name__ == "__main__":
+    main()
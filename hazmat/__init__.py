@@ -1,6 +1,6 @@
 #!/usr/bin/env python3
 from .options import OptionsDispacher
-from . import tmp_utils
+from . import tmp_utils, process
 from .output import *
 
 
@@ -16,6 +16,7 @@ def main():
         print(e)
         print("\t Be aware that some files need executive permission")
     finally:
+        process.kill_all()
         tmp_utils.clear_up()
 
 
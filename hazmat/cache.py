@@ -0,0 +1,136 @@
+import hashlib
+import json
+import os
+import shutil
+from collections import OrderedDict
+from threading import Lock
+from . import config
+from .models.enums import RunStatus
+from .models.usage import Usage
+from .utils import file_digest, directory_digest
+
+RESULTS_DIR = config.CONFIG_DIR + "cache/results/"
+
+
+class ResultCache(object):
+    maxEntries = 10000
+    version = 2
+
+    def __init__(self, solution, validator, maxEntries = None, directory = None):
+        self.fileName = RESULTS_DIR + directory_digest(directory) + ".json"
+        if maxEntries is not None:
+            self.maxEntries = maxEntries
+        self.lock = Lock()
+        self.entries = OrderedDict()
+        self.load()
+
+        checker = "builtin"
+        if validator.checker is not None:
+            checkerPath = validator.checker if os.path.isfile(validator.checker) else shutil.which(validator.checker)
+            checker = file_digest(checkerPath) if checkerPath else validator.checker
+        self.prefix = json.dumps([ResultCache.version, file_digest(solution.execFile), solution.timeout, solution.timeMode,
+                                  solution.limits.memory, solution.limits.stack, solution.limits.output, checker, validator.needInput, validator.flags])
+
+    def load(self):
+        try:
+            with open(self.fileName) as file:
+                self.entries = json.load(file, object_pairs_hook = OrderedDict)
+        except (OSError, ValueError):
+            self.entries = OrderedDict()
+
+    def save(self):
+        with self.lock:
+            while len(self.entries) > self.maxEntries:
+                self.entries.popitem(last = False)
+            os.makedirs(RESULTS_DIR, exist_ok = True)
+            partName = "{}.{}.part".format(self.fileName, os.getpid())
+            with open(partName, "w") as file:
+                json.dump(self.entries, file)
+            os.replace(partName, self.fileName)
+
+    def key(self, inFile, outFile):
+        digests = "{} {} {}".format(self.prefix, file_digest(inFile), file_digest(outFile))
+        return hashlib.sha256(digests.encode()).hexdigest()
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            self.entries.move_to_end(key)
+        status, wall, cpu, maxRss, result = entry
+        return RunStatus[status], Usage(wall = wall, cpu = cpu, maxRss = maxRss), result
+
+    def put(self, key, status, usage, result):
+        with self.lock:
+            self.entries[key] = [status.name, usage.wall, usage.cpu, usage.maxRss, bool(result)]
+            self.entries.move_to_end(key)
+
+
+def compiler_identity(compiler):
+    words = compiler.split()
+    path = shutil.which(words[0]) if len(words) > 0 else None
+    if path is None:
+        return compiler
+    path = os.path.realpath(path)
+    stat = os.stat(path)
+    return [compiler, path, stat.st_mtime_ns, stat.st_size]
+
+
+class CompileCache(object):
+    version = 3
+
+    def __init__(self):
+        self.directory = config.CONFIG_DIR + "cache/compile/"
+        self.maxSize = config.config.get("compile-cache-size", 512) * 2 ** 20
+        self.enabled = config.config.get("compile-cache", True)
+
+    def key(self, solution, flags, digests):
+        if not isinstance(flags, list):
+            flags = solution.info.default_flags
+        sourceDir = os.path.dirname(digests[0][0])
+        headers = [(os.path.relpath(path, sourceDir), digest) for path, digest in digests[1:]]
+        description = json.dumps([CompileCache.version, digests[0][1], headers, compiler_identity(solution.info.compiler), flags, solution.info.formater])
+        return hashlib.sha256(description.encode()).hexdigest()
+
+    def fetch(self, key, execFile):
+        entry = self.directory + key
+        if not os.path.isfile(entry):
+            return False
+        partName = execFile + ".part"
+        try:
+            os.link(entry, partName)
+        except OSError:
+            shutil.copy2(entry, partName)
+        os.replace(partName, execFile)
+        os.utime(execFile)
+        return True
+
+    def store(self, key, execFile):
+        if not os.path.isdir(self.directory):
+            os.makedirs(self.directory)
+        partName = "{}{}.{}.part".format(self.directory, key, os.getpid())
+        shutil.copy2(execFile, partName)
+        os.replace(partName, self.directory + key)
+        self.evict()
+
+    def evict(self):
+        entries = []
+        for name in os.listdir(self.directory):
+            if name.endswith(".part"):
+                continue
+            try:
+                stat = os.stat(self.directory + name)
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, name))
+        entries.sort()
+        total = sum(size for _, size, _ in entries)
+        for _, size, name in entries:
+            if total <= self.maxSize:
+                break
+            try:
+                os.remove(self.directory + name)
+            except OSError:
+                pass
+            total -= size
@@ -1,12 +1,37 @@
-import json
+import marshal
 import os
 
 CONFIG_DIR = os.path.expanduser("~") + "/.config/hazmat/"
 CONFIG_FILE = CONFIG_DIR + "hazmat.json"
+CONFIG_CACHE = CONFIG_DIR + "cache/config.marshal"
 
-with open(CONFIG_FILE) as config_file:
-    global config
-    config = json.load(config_file)
+
+def load_config():
+    stat = os.stat(CONFIG_FILE)
+    signature = (stat.st_mtime_ns, stat.st_size)
+    try:
+        with open(CONFIG_CACHE, "rb") as cache_file:
+            cached_signature, data = marshal.load(cache_file)
+        if cached_signature == signature:
+            return data
+    except (OSError, EOFError, ValueError, TypeError):
+        pass
+
+    import json
+    with open(CONFIG_FILE) as config_file:
+        data = json.load(config_file)
+    try:
+        os.makedirs(os.path.dirname(CONFIG_CACHE), exist_ok = True)
+        part = "{}.{}.part".format(CONFIG_CACHE, os.getpid())
+        with open(part, "wb") as cache_file:
+            marshal.dump((signature, data), cache_file)
+        os.replace(part, CONFIG_CACHE)
+    except (OSError, ValueError):
+        pass
+    return data
+
+
+config = load_config()
 
 
 class Logistics(object):
@@ -51,16 +76,33 @@ class Logistics(object):
         return ret
 
 
-providers = dict()
+class Providers(object):
+
+    def __init__(self, languages):
+        self.languages = {el['extension']: el for el in languages}
+        self.parsed = dict()
+
+    def parse(self, el):
+        log = Logistics(el['name'], el['extension'])
+        if 'compile' in el:
+            com = el['compile']
+            log.compile_info(com['compiler'], com['format'], com['default-flags'])
+        if 'init' in el:
+            log.init_info(el['init'])
+        if 'merge' in el:
+            log.merge_info(el['merge'])
+        return log
+
+    def __contains__(self, extension):
+        return extension in self.languages
+
+    def __getitem__(self, extension):
+        if extension not in self.parsed:
+            self.parsed[extension] = self.parse(self.languages[extension])
+        return self.parsed[extension]
+
+    def __iter__(self):
+        return iter(self.languages)
 
-for el in config['languages']:
-    log = Logistics(el['name'], el['extension'])
-    if 'compile' in el:
-        com = el['compile']
-        log.compile_info(com['compiler'], com['format'], com['default-flags'])
-    if 'init' in el:
-        log.init_info(el['init'])
-    if 'merge' in el:
-        log.merge_info(el['merge'])
 
-    providers[el['extension']] = log
+providers = Providers(config['languages'])
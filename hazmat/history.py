@@ -0,0 +1,93 @@
+import json
+import os
+from threading import Lock
+from . import config
+from .utils import directory_digest
+
+HISTORY_DIR = config.CONFIG_DIR + "cache/history/"
+
+
+class TestHistory(object):
+    smoothing = 0.5
+
+    def __init__(self, directory = None):
+        self.fileName = HISTORY_DIR + directory_digest(directory) + ".json"
+        self.lock = Lock()
+        self.durations = dict()
+        self.verdicts = dict()
+        self.load()
+
+    def load(self):
+        try:
+            with open(self.fileName) as file:
+                data = json.load(file)
+            self.durations = data.get("durations", dict())
+            self.verdicts = data.get("verdicts", dict())
+        except (OSError, ValueError, AttributeError):
+            self.durations = dict()
+            self.verdicts = dict()
+
+    def save(self):
+        with self.lock:
+            data = {"durations": self.durations, "verdicts": self.verdicts}
+            os.makedirs(HISTORY_DIR, exist_ok = True)
+            partName = "{}.{}.part".format(self.fileName, os.getpid())
+            with open(partName, "w") as file:
+                json.dump(data, file)
+            os.replace(partName, self.fileName)
+
+    def record(self, inFile, duration):
+        with self.lock:
+            previous = self.durations.get(inFile)
+            if previous is None:
+                self.durations[inFile] = duration
+            else:
+                self.durations[inFile] = self.smoothing * duration + (1 - self.smoothing) * previous
+
+    def estimates(self, inFiles):
+        sizes = [os.path.getsize(inFile) for inFile in inFiles]
+        knownTime = 0.0
+        knownSize = 0
+        for inFile, size in zip(inFiles, sizes):
+            if inFile in self.durations:
+                knownTime += self.durations[inFile]
+                knownSize += size
+
+        if knownSize > 0:
+            perByte = knownTime / knownSize
+        elif knownTime > 0:
+            perByte = 0.0
+        else:
+            perByte = 1.0
+        return [self.durations.get(inFile, size * perByte) for inFile, size in zip(inFiles, sizes)]
+
+    def schedule(self, listTests):
+        estimates = self.estimates([inFile for inFile, _ in listTests])
+        return sorted(range(len(listTests)), key = lambda index: -estimates[index])
+
+    def signature(self, inFile, outFile):
+        inStat = os.stat(inFile)
+        outStat = os.stat(outFile)
+        return [inStat.st_mtime_ns, inStat.st_size, outStat.st_mtime_ns, outStat.st_size]
+
+    def recordVerdict(self, inFile, outFile, passed):
+        signature = self.signature(inFile, outFile)
+        with self.lock:
+            self.verdicts[inFile] = {"passed": passed, "signature": signature}
+
+    def prioritize(self, listTests, onlyFailed = False):
+        failed = []
+        changed = []
+        passed = []
+        for inFile, outFile in listTests:
+            entry = self.verdicts.get(inFile)
+            if entry is None or entry["signature"] != self.signature(inFile, outFile):
+                changed.append((inFile, outFile))
+            elif not entry["passed"]:
+                failed.append((inFile, outFile))
+            else:
+                passed.append((inFile, outFile))
+
+        if onlyFailed:
+            return failed + changed
+        return failed + changed + passed
@@ -0,0 +1,371 @@
+import mmap
+import os
+
+WHITESPACE = b" \t\r\f\v"
+CHUNK_SIZE = 1 << 20
+MMAP_THRESHOLD = 1 << 20
+
+
+class Mismatch(object):
+
+    def __init__(self, line, token, expected, actual):
+        self.line = line
+        self.token = token
+        self.expected = expected
+        self.actual = actual
+
+    def __bool__(self):
+        return False
+
+    def _show(self, value):
+        if value is None:
+            return "EOF"
+        value = value.decode(errors = "replace")
+        if len(value) > 32:
+            value = value[:29] + "..."
+        return value
+
+    def __str__(self):
+        return "line {} token {}: expected {} got {}".format(self.line, self.token, self._show(self.expected), self._show(self.actual))
+
+
+def mismatch_reason(result):
+    if isinstance(result, Mismatch):
+        return str(result)
+    return None
+
+
+def _open_content(file):
+    size = os.fstat(file.fileno()).st_size
+    if size >= MMAP_THRESHOLD:
+        return mmap.mmap(file.fileno(), 0, access = mmap.ACCESS_READ)
+    return file.read()
+
+
+def _stripped_chunks(content):
+    size = len(content)
+    trailing = size > 0 and content[size - 1:size] == b"\n"
+    for offset in range(0, size, CHUNK_SIZE):
+        chunk = content[offset:offset + CHUNK_SIZE].translate(None, WHITESPACE)
+        if trailing and offset + CHUNK_SIZE >= size:
+            chunk = chunk[:-1]
+        yield chunk
+
+
+def _same(expected, actual):
+    if (len(expected) == 0) != (len(actual) == 0):
+        return False
+    if isinstance(expected, bytes) and isinstance(actual, bytes) and expected == actual:
+        return True
+
+    chunksExpected = _stripped_chunks(expected)
+    chunksActual = _stripped_chunks(actual)
+    bufExpected = bufActual = b""
+    eofExpected = eofActual = False
+    while True:
+        while not eofExpected and len(bufExpected) < CHUNK_SIZE:
+            chunk = next(chunksExpected, None)
+            if chunk is None:
+                eofExpected = True
+            else:
+                bufExpected += chunk
+        while not eofActual and len(bufActual) < CHUNK_SIZE:
+            chunk = next(chunksActual, None)
+            if chunk is None:
+                eofActual = True
+            else:
+                bufActual += chunk
+
+        n = min(len(bufExpected), len(bufActual))
+        if bufExpected[:n] != bufActual[:n]:
+            return False
+        bufExpected = bufExpected[n:]
+        bufActual = bufActual[n:]
+        if eofExpected and eofActual:
+            return len(bufExpected) == len(bufActual) == 0
+        if (eofExpected and len(bufExpected) == 0 and len(bufActual) > 0) or (eofActual and len(bufActual) == 0 and len(bufExpected) > 0):
+            return False
+
+
+def _lines(content):
+    start = 0
+    size = len(content)
+    while start < size:
+        end = content.find(b"\n", start)
+        if end == -1:
+            end = size
+        yield content[start:end]
+        start = end + 1
+
+
+def _locate(expected, actual):
+    linesExpected = _lines(expected)
+    linesActual = _lines(actual)
+    lineNumber = 0
+    while True:
+        lineNumber += 1
+        lineExpected = next(linesExpected, None)
+        lineActual = next(linesActual, None)
+        if lineExpected is None and lineActual is None:
+            return None
+        if lineExpected is None or lineActual is None:
+            tokens = (lineExpected if lineActual is None else lineActual).split()
+            value = tokens[0] if len(tokens) > 0 else b""
+            if lineExpected is None:
+                return Mismatch(lineNumber, 1, None, value)
+            return Mismatch(lineNumber, 1, value, None)
+        if lineExpected.translate(None, WHITESPACE) == lineActual.translate(None, WHITESPACE):
+            continue
+
+        tokensExpected = lineExpected.split()
+        tokensActual = lineActual.split()
+        for index in range(max(len(tokensExpected), len(tokensActual))):
+            tokenExpected = tokensExpected[index] if index < len(tokensExpected) else None
+            tokenActual = tokensActual[index] if index < len(tokensActual) else None
+            if tokenExpected != tokenActual:
+                return Mismatch(lineNumber, index + 1, tokenExpected, tokenActual)
+
+
+def compare_bytes(expected, actual):
+    if _same(expected, actual):
+        return True
+    mismatch = _locate(expected, actual)
+    if mismatch is None:
+        mismatch = Mismatch(1, 1, None, None)
+    return mismatch
+
+
+def compare_tokens(expectedFile, actualFile):
+    with open(expectedFile, "rb") as fileExpected, open(actualFile, "rb") as fileActual:
+        expected = _open_content(fileExpected)
+        actual = _open_content(fileActual)
+        try:
+            return compare_bytes(expected, actual)
+        finally:
+            for content in (expected, actual):
+                if isinstance(content, mmap.mmap):
+                    content.close()
+
+
+class CapturedOutput(object):
+    __slots__ = ("data", "spillFile", "file", "mapped")
+    spillThreshold = 16 << 20
+
+    def __init__(self, spillFile = None):
+        self.data = bytearray()
+        self.spillFile = spillFile
+        self.file = None
+        self.mapped = None
+
+    def consume(self, chunk):
+        if self.file is not None:
+            self.file.write(chunk)
+            return
+        self.data += chunk
+        if self.spillFile is not None and len(self.data) > CapturedOutput.spillThreshold:
+            self.file = open(self.spillFile, "w+b")
+            self.file.write(self.data)
+            self.data = bytearray()
+
+    def content(self):
+        if self.file is None:
+            return self.data
+        if self.mapped is None:
+            self.file.flush()
+            self.file.seek(0)
+            self.mapped = _open_content(self.file)
+        return self.mapped
+
+    def store(self, fileName):
+        if self.file is not None and fileName == self.spillFile:
+            self.file.flush()
+            return
+        with open(fileName, "wb") as file:
+            file.write(self.content())
+
+    def close(self):
+        if isinstance(self.mapped, mmap.mmap):
+            self.mapped.close()
+        self.mapped = None
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+
+def _raw_offset(chunk, count):
+    for offset, byte in enumerate(chunk):
+        if byte not in WHITESPACE:
+            if count == 0:
+                return offset
+            count -= 1
+    return len(chunk)
+
+
+class OnlineComparator(object):
+    tokenLimit = 32
+
+    def __init__(self, expected):
+        self.expected = expected
+        self.expectedChunks = _stripped_chunks(expected)
+        self.buffer = b""
+        self.position = 0
+        self.eof = False
+        self.pendingNewline = False
+        self.newlines = 0
+        self.previousLine = b""
+        self.partialLine = []
+        self.empty = True
+        self.failure = None
+        self.mismatch = None
+        self.stopped = False
+
+    @staticmethod
+    def createFromFile(fileName):
+        with open(fileName, "rb") as file:
+            return OnlineComparator(_open_content(file))
+
+    def close(self):
+        if isinstance(self.expected, mmap.mmap):
+            self.expected.close()
+
+    def _remaining(self):
+        return len(self.buffer) - self.position
+
+    def _fill(self, size):
+        while not self.eof and self._remaining() < size:
+            chunk = next(self.expectedChunks, None)
+            if chunk is None:
+                self.eof = True
+            else:
+                self.buffer = self.buffer[self.position:] + chunk
+                self.position = 0
+
+    def _match(self, stripped):
+        self._fill(len(stripped))
+        start = self.position
+        size = min(len(stripped), self._remaining())
+        if size == len(stripped) and self.buffer.startswith(stripped, start):
+            self.position += size
+            return size
+        matched = 0
+        while matched < size and stripped[matched] == self.buffer[start + matched]:
+            matched += 1
+        return matched
+
+    def _expectedLine(self, lineNumber):
+        size = len(self.expected)
+        offset = 0
+        remaining = lineNumber - 1
+        while remaining > 0 and offset < size:
+            end = min(offset + CHUNK_SIZE, size)
+            count = self.expected[offset:end].count(b"\n")
+            if count < remaining:
+                remaining -= count
+                offset = end
+                continue
+            while remaining > 0:
+                offset = self.expected.find(b"\n", offset, end) + 1
+                remaining -= 1
+        if offset >= size:
+            return None
+        end = self.expected.find(b"\n", offset)
+        return self.expected[offset:size if end == -1 else end]
+
+    def _fail(self, lineNumber, actualLine):
+        expectedLine = self._expectedLine(lineNumber)
+        if expectedLine is None:
+            tokens = (actualLine or b"").split()
+            self.mismatch = Mismatch(lineNumber, 1, None, tokens[0] if len(tokens) > 0 else b"")
+            return self.mismatch
+        if actualLine is None:
+            tokens = expectedLine.split()
+            self.mismatch = Mismatch(lineNumber, 1, tokens[0] if len(tokens) > 0 else b"", None)
+            return self.mismatch
+        mismatch = _locate(expectedLine, actualLine)
+        if mismatch is None:
+            mismatch = Mismatch(1, 1, None, None)
+        mismatch.line = lineNumber
+        self.mismatch = mismatch
+        return mismatch
+
+    def _pending(self):
+        _, line, offset = self.failure
+        if line is None:
+            return False
+        rest = line[offset:].lstrip(WHITESPACE)
+        return len(rest) <= self.tokenLimit and len(line) - offset <= CHUNK_SIZE and len(rest.translate(None, WHITESPACE)) == len(rest)
+
+    def _extend(self, chunk):
+        end = chunk.find(b"\n")
+        self.failure[1] += chunk if end == -1 else chunk[:end]
+        return end == -1 and self._pending()
+
+    def feed(self, chunk):
+        if len(chunk) == 0:
+            return True
+        if self.failure is not None:
+            return self._extend(chunk)
+        self.empty = False
+        if len(self.expected) == 0:
+            line = chunk.split(b"\n", 1)[0]
+            self.failure = [1, line, 0]
+            return len(line) == len(chunk) and self._pending()
+        stripped = chunk.translate(None, WHITESPACE)
+        held = 1 if self.pendingNewline else 0
+        if held:
+            stripped = b"\n" + stripped
+        self.pendingNewline = chunk.endswith(b"\n")
+        if self.pendingNewline:
+            stripped = stripped[:-1]
+
+        matched = self._match(stripped)
+        if matched < len(stripped):
+            lineNumber = self.newlines + stripped.count(b"\n", 0, matched) - held + 1
+            if stripped[matched:matched + 1] == b"\n" and matched >= self._remaining():
+                lineNumber += 1
+            window = (self.previousLine + b"\n" + b"".join(self.partialLine) + chunk).split(b"\n")
+            index = lineNumber - self.newlines
+            if not 0 <= index < len(window):
+                self.failure = [lineNumber, None, 0]
+                return False
+            self.failure = [lineNumber, window[index], 0]
+            if index < len(window) - 1:
+                return False
+            offset = _raw_offset(chunk, max(matched - held, 0)) - len(chunk) + len(window[index])
+            self.failure[2] = max(offset, 0)
+            return self._pending()
+
+        last = chunk.rfind(b"\n")
+        if last == -1:
+            self.partialLine.append(chunk)
+        else:
+            before = chunk.rfind(b"\n", 0, last)
+            if before == -1:
+                self.previousLine = b"".join(self.partialLine) + chunk[:last]
+            else:
+                self.previousLine = chunk[before + 1:last]
+            self.partialLine = [chunk[last + 1:]]
+            self.newlines += chunk.count(b"\n")
+        return True
+
+    def consume(self, chunk):
+        if not self.stopped:
+            self.stopped = not self.feed(chunk)
+
+    def finish(self):
+        if self.mismatch is not None:
+            return self.mismatch
+        if self.failure is not None:
+            return self._fail(*self.failure[:2])
+        if self.empty and len(self.expected) > 0:
+            self.mismatch = _locate(self.expected, b"")
+            return self.mismatch
+        self._fill(1)
+        if self._remaining() > 0:
+            lineNumber = self.newlines + (0 if self.pendingNewline else 1)
+            actualLine = self.previousLine if self.pendingNewline else b"".join(self.partialLine)
+            if self.buffer[self.position:self.position + 1] == b"\n":
+                lineNumber += 1
+                actualLine = None
+            return self._fail(lineNumber, actualLine)
+        return True
@@ -1,40 +1,96 @@
+import heapq
+import itertools
 from .enums import RunStatus
+from .stats import QuantileSketch
 from ..output import *
 
 
 class ResultCounter(object):
-    class Event(object):
-        def __init__(self, status, testName, duration, success):
-            self.status = status
-            self.testName = testName
-            self.duration = duration
-            self.success = success
+    sampleSize = 20
+    slowestCount = 10
+    quantiles = (0.5, 0.9, 0.99)
+
+    class Bucket(object):
+        __slots__ = ("count", "samples", "sketch")
+
+        def __init__(self):
+            self.count = 0
+            self.samples = []
+            self.sketch = QuantileSketch()
+
+        def add(self, testName, duration):
+            self.count += 1
+            self.sketch.add(duration.wall)
+            if len(self.samples) < ResultCounter.sampleSize:
+                self.samples.append((testName, duration))
+
+        def __iadd__(self, other):
+            self.count += other.count
+            self.sketch += other.sketch
+            self.samples.extend(other.samples[:ResultCounter.sampleSize - len(self.samples)])
+            return self
 
     def __init__(self, baseDir, store = False):
         self.baseDir = baseDir
         self.store = store
-        self.events = []
+        self.buckets = dict()
+        self.slowest = []
+        self.sequence = itertools.count()
 
         self.errorCounter = dict()
         self.acCount = 0
         self.waCount = 0
+        self.cachedCount = 0
+        self.timings = []
+        self.timingCount = 0
+        self.cvSum = 0.0
+        self.slowestMedian = None
+
+    def _bucket(self, key):
+        bucket = self.buckets.get(key)
+        if bucket is None:
+            bucket = self.buckets[key] = ResultCounter.Bucket()
+        return bucket
+
+    def _record(self, key, testName, duration):
+        if not self.store:
+            return
+        self._bucket(key).add(testName, duration)
+        self._pushSlowest(duration.wall, testName, duration)
+
+    def _pushSlowest(self, wall, testName, duration):
+        entry = (wall, next(self.sequence), testName, duration)
+        if len(self.slowest) < ResultCounter.slowestCount:
+            heapq.heappush(self.slowest, entry)
+        elif wall > self.slowest[0][0]:
+            heapq.heapreplace(self.slowest, entry)
 
     def addError(self, testName, duration, status):
         if status in self.errorCounter:
             self.errorCounter[status] += 1
         else:
             self.errorCounter[status] = 1
-
-        if self.store:
-            self.events.append(ResultCounter.Event(status, testName, duration, False))
+        self._record((status, False), testName, duration)
 
     def addResult(self, testName, duration, result):
         if result:
             self.acCount += 1
         else:
             self.waCount += 1
-        if self.store:
-            self.events.append(ResultCounter.Event(RunStatus.OK, testName, duration, result))
+        self._record((RunStatus.OK, bool(result)), testName, duration)
+
+    def addTiming(self, testName, stats):
+        self._mergeTimings([(testName, stats)], 1, stats.cv, (stats.median, testName))
+
+    def _mergeTimings(self, timings, count, cvSum, slowestMedian):
+        self.timingCount += count
+        self.cvSum += cvSum
+        self.timings.extend(timings[:ResultCounter.sampleSize - len(self.timings)])
+        if self.slowestMedian is None or (slowestMedian is not None and slowestMedian[0] > self.slowestMedian[0]):
+            self.slowestMedian = slowestMedian
+
+    def addCached(self):
+        self.cachedCount += 1
 
     def __iadd__(self, other):
         if not isinstance(other, ResultCounter):
@@ -48,7 +104,14 @@ class ResultCounter(object):
 
         self.acCount += other.acCount
         self.waCount += other.waCount
-        self.events.extend(other.events)
+        self.cachedCount += other.cachedCount
+        self._mergeTimings(other.timings, other.timingCount, other.cvSum, other.slowestMedian)
+
+        for key, bucket in other.buckets.items():
+            merged = self._bucket(key)
+            merged += bucket
+        for wall, _, testName, duration in other.slowest:
+            self._pushSlowest(wall, testName, duration)
 
         return self
 
@@ -59,28 +122,57 @@ class ResultCounter(object):
 
         for key, value in self.errorCounter.items():
             printExc(key, value)
+        if self.cachedCount > 0:
+            printInfo("{} verdicts from cache".format(self.cachedCount))
+
+    def _printSamples(self, key, printSample):
+        bucket = self.buckets.get(key)
+        if bucket is None:
+            return
+        for testName, duration in bucket.samples:
+            printSample(testName, duration)
+        if bucket.count > len(bucket.samples):
+            printArrow("... and {} more".format(bucket.count - len(bucket.samples)))
 
     def summary(self, level = 3):
         printInfo("Summary of run")
         if self.acCount > 0 and level > 2:
             printInfo("AC")
-            for event in self.events:
-                if event.status == RunStatus.OK and event.success:
-                    printAC(event.testName, event.duration)
+            self._printSamples((RunStatus.OK, True), printAC)
         if self.waCount > 0 and level > 1:
             printInfo("WA")
-            for event in self.events:
-                if event.status == RunStatus.OK and not event.success:
-                    printWA(event.testName, event.duration)
+            self._printSamples((RunStatus.OK, False), printWA)
         if level > 0:
             if RunStatus.TLE in self.errorCounter:
                 printInfo("TLE")
-                for event in self.events:
-                    if event.status == RunStatus.TLE:
-                        printTLE(event.testName)
-            if len(self.errorCounter) - int(RunStatus.TLE in self.errorCounter) > 0:
+                self._printSamples((RunStatus.TLE, False), lambda testName, duration: printTLE(testName))
+            if RunStatus.MLE in self.errorCounter:
+                printInfo("MLE")
+                self._printSamples((RunStatus.MLE, False), lambda testName, duration: printMLE(testName))
+            if RunStatus.OLE in self.errorCounter:
+                printInfo("OLE")
+                self._printSamples((RunStatus.OLE, False), lambda testName, duration: printOLE(testName))
+            limitStatuses = (RunStatus.OK, RunStatus.TLE, RunStatus.MLE, RunStatus.OLE)
+            fuckups = [status for status in self.errorCounter if status not in limitStatuses]
+            if len(fuckups) > 0:
                 printInfo("Fuckups")
-                for event in self.events:
-                    if event.status != RunStatus.OK and event.status != RunStatus.TLE:
-                        printError(event.status.name, end = "")
-                        printArrow(event.testName)
+                for status in fuckups:
+                    self._printSamples((status, False), lambda testName, duration: printExc(status, testName))
+        if level > 0 and len(self.buckets) > 0:
+            printInfo("Wall time percentiles")
+            for (status, success), bucket in self.buckets.items():
+                name = ("AC" if success else "WA") if status == RunStatus.OK else status.name
+                printArrow("{} {}".format(name, " ".join("p{:g} {:.3f}".format(100 * q, bucket.sketch.quantile(q)) for q in ResultCounter.quantiles)))
+            printInfo("Slowest")
+            for wall, _, testName, duration in sorted(self.slowest, reverse = True):
+                printArrow(testName, end = "")
+                printUsage(duration)
+        if self.timingCount > 0 and level > 0:
+            printInfo("Timing")
+            for testName, stats in self.timings:
+                printArrow(testName, end = "")
+                printStats(stats)
+            if self.timingCount > len(self.timings):
+                printArrow("... and {} more".format(self.timingCount - len(self.timings)))
+            printInfo("Slowest median {:.3f} on {}".format(*self.slowestMedian))
+            printInfo("Mean cv {:.1f}%".format(100 * self.cvSum / self.timingCount))
@@ -0,0 +1,54 @@
+import json
+import os
+import re
+from ..utils import file_digest
+
+INCLUDE = re.compile(rb'^[ \t]*#[ \t]*include[ \t]*"([^"\n]+)"', re.M)
+
+
+def scan_dependencies(sourceFile):
+    sourceFile = os.path.normpath(sourceFile)
+    found = set()
+    stack = [sourceFile]
+    while stack:
+        path = stack.pop()
+        if path in found or not os.path.isfile(path):
+            continue
+        found.add(path)
+        with open(path, "rb") as file:
+            content = file.read()
+        for match in INCLUDE.finditer(content):
+            include = match.group(1).decode(errors = "replace")
+            stack.append(os.path.normpath(os.path.join(os.path.dirname(path), include)))
+
+    found.discard(sourceFile)
+    return [sourceFile] + sorted(found)
+
+
+def dependency_digests(sourceFile):
+    return [(path, file_digest(path)) for path in scan_dependencies(sourceFile)]
+
+
+def deps_file(execFile):
+    return execFile + ".deps"
+
+
+def record_dependencies(execFile, digests):
+    with open(deps_file(execFile), "w") as file:
+        json.dump(digests, file)
+
+
+def dependencies_changed(sourceFile, execFile):
+    execTime = os.path.getmtime(execFile)
+    try:
+        with open(deps_file(execFile)) as file:
+            digests = json.load(file)
+    except (OSError, ValueError):
+        return any(os.path.getmtime(path) > execTime for path in scan_dependencies(sourceFile))
+
+    for path, digest in digests:
+        if not os.path.isfile(path):
+            return True
+        if os.path.getmtime(path) > execTime and file_digest(path) != digest:
+            return True
+    return False
@@ -4,6 +4,8 @@ from enum import Enum
 class RunStatus(Enum):
     OK = 0
     TLE = -999
+    MLE = -998
+    OLE = -997
     SIGINT = -2
     SIGABRT = -6
     SIGSEGV = -11
@@ -18,6 +20,8 @@ def _RunStatus_parser(cls, value):
     else:
         return {0: RunStatus.OK,
                 -999: RunStatus.TLE,
+                -998: RunStatus.MLE,
+                -997: RunStatus.OLE,
                 -2: RunStatus.SIGINT,
                 -6: RunStatus.SIGABRT,
                 -11: RunStatus.SIGSEGV,
@@ -1,29 +1,42 @@
-from subprocess import Popen, PIPE, DEVNULL
+from subprocess import DEVNULL, TimeoutExpired
+from .. import process
 
 
 class GeneratorError(Exception):
 
     def __init__(self, message):
-        super(GeneratorError, self).__init(message)
+        super(GeneratorError, self).__init__(message)
 
 
 class Generator:
 
-    def __init__(self, name, message, flags = []):
+    def __init__(self, name, message, flags = [], timeout = None):
         self.name = name
         self.message = message
         self.flags = flags
+        self.timeout = timeout
         self.callList = [self.name]
         self.callList.extend(self.flags)
 
     def generate(self, outFile):
 
         try:
-            proc = Popen(self.callList, stdin=PIPE, stdout = open(outFile, "w"), stderr = DEVNULL)
-            proc.communicate(input = self.message.encode())
-            proc.wait()
+            with open(outFile, "w") as stdout:
+                returnCode = process.communicate(self.callList, input = self.message.encode(), timeout = self.timeout, stdout = stdout.fileno(), stderr = DEVNULL)
 
-            if proc.returncode != 0:
-                raise GeneratorError()
+            if returnCode != 0:
+                raise GeneratorError("Generator {} returned {}".format(self.name, returnCode))
+        except TimeoutExpired:
+            raise GeneratorError("Generator {} got timeout".format(self.name))
         except KeyboardInterrupt:
             raise KeyboardInterrupt
+
+    def generateBytes(self):
+        try:
+            returnCode, output = process.capture(self.callList, input = self.message.encode(), timeout = self.timeout, stderr = DEVNULL)
+        except TimeoutExpired:
+            raise GeneratorError("Generator {} got timeout".format(self.name))
+
+        if returnCode != 0:
+            raise GeneratorError("Generator {} returned {}".format(self.name, returnCode))
+        return output
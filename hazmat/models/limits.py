@@ -0,0 +1,156 @@
+import itertools
+import os
+import resource
+import signal
+import time
+
+CGROUP_ROOT = "/sys/fs/cgroup"
+
+
+def _own_cgroup():
+    try:
+        with open("/proc/self/cgroup") as file:
+            entries = [line.rstrip("\n").split(":", 2) for line in file]
+    except OSError:
+        return None, None
+    for hierarchy, controllers, path in entries:
+        if "memory" in controllers.split(","):
+            return CGROUP_ROOT + "/memory" + path, 1
+    for hierarchy, controllers, path in entries:
+        if hierarchy == "0":
+            return CGROUP_ROOT + path, 2
+    return None, None
+
+
+class MemoryCgroup(object):
+    parent = None
+    version = None
+    counter = itertools.count()
+    removeAttempts = 50
+    removeDelay = 0.01
+    # version: limit, swap limit, peak usage, oom events
+    files = {1: ("memory.limit_in_bytes", "memory.memsw.limit_in_bytes", "memory.max_usage_in_bytes", "memory.oom_control"),
+             2: ("memory.max", "memory.swap.max", "memory.peak", "memory.events")}
+
+    def available():
+        if MemoryCgroup.parent is None:
+            MemoryCgroup.parent = ""
+            path, version = _own_cgroup()
+            try:
+                if version == 1:
+                    usable = os.path.isfile(path + "/memory.limit_in_bytes")
+                else:
+                    with open(path + "/cgroup.subtree_control") as file:
+                        usable = "memory" in file.read().split()
+                if usable and os.access(path, os.W_OK):
+                    MemoryCgroup.parent = path
+                    MemoryCgroup.version = version
+            except (OSError, TypeError):
+                pass
+        return MemoryCgroup.parent != ""
+
+    def __init__(self, limit):
+        self.path = "{}/hazmat-{}-{}".format(MemoryCgroup.parent, os.getpid(), next(MemoryCgroup.counter))
+        self.limitFile, swapFile, self.peakFile, self.eventsFile = MemoryCgroup.files[MemoryCgroup.version]
+        self.attached = False
+        os.mkdir(self.path)
+        try:
+            self._write(self.limitFile, limit)
+            self._write(swapFile, 0 if MemoryCgroup.version == 2 else limit)
+        except OSError:
+            self.remove()
+            raise
+
+    def _write(self, name, value):
+        with open(self.path + "/" + name, "w") as file:
+            file.write(str(value))
+
+    def attach(self, pid):
+        self._write("cgroup.procs", pid)
+        self.attached = True
+
+    def peak(self):
+        try:
+            with open(self.path + "/" + self.peakFile) as file:
+                return int(file.read())
+        except (OSError, ValueError):
+            return None
+
+    def oomKilled(self):
+        try:
+            with open(self.path + "/" + self.eventsFile) as file:
+                for line in file:
+                    key, value = line.split()
+                    if key == "oom_kill":
+                        return int(value) > 0
+        except (OSError, ValueError):
+            pass
+        return False
+
+    def kill(self):
+        if MemoryCgroup.version == 2:
+            try:
+                self._write("cgroup.kill", 1)
+                return
+            except OSError:
+                pass
+        try:
+            with open(self.path + "/cgroup.procs") as file:
+                pids = [int(line) for line in file]
+        except (OSError, ValueError):
+            return
+        for pid in pids:
+            try:
+                os.kill(pid, signal.SIGKILL)
+            except OSError:
+                pass
+
+    def remove(self):
+        for _attempt in range(MemoryCgroup.removeAttempts):
+            try:
+                os.rmdir(self.path)
+                return
+            except FileNotFoundError:
+                return
+            except OSError:
+                self.kill()
+                time.sleep(MemoryCgroup.removeDelay)
+
+
+class Limits(object):
+
+    def createFromArgs(args):
+        megabyte = 2 ** 20
+        memory = args["memorylimit"]
+        stack = args["stacklimit"]
+        output = args["outputlimit"]
+        return Limits(memory = None if memory is None else int(memory * megabyte), stack = None if stack is None else int(stack * megabyte), output = None if output is None else int(output * megabyte))
+
+    def __init__(self, memory = None, stack = None, output = None):
+        self.memory = memory
+        self.stack = stack
+        self.output = output
+
+    def active(self):
+        return self.memory is not None or self.stack is not None
+
+    def cgroup(self):
+        if self.memory is None or not MemoryCgroup.available():
+            return None
+        try:
+            return MemoryCgroup(self.memory)
+        except OSError:
+            return None
+
+    def apply(self, pid, cgroup):
+        attached = False
+        if cgroup is not None:
+            try:
+                cgroup.attach(pid)
+                attached = True
+            except OSError:
+                pass
+        if not attached and self.memory is not None:
+            resource.prlimit(pid, resource.RLIMIT_AS, (self.memory, self.memory))
+        if self.stack is not None:
+            resource.prlimit(pid, resource.RLIMIT_STACK, (self.stack, self.stack))
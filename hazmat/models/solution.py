@@ -1,16 +1,37 @@
-import time
 import os
-from subprocess import DEVNULL, TimeoutExpired, call
+import resource
+import time
+from subprocess import DEVNULL, TimeoutExpired
 from .enums import RunStatus
-from .. import config
+from .dependencies import dependency_digests, record_dependencies, dependencies_changed
+from .limits import Limits
+from .stats import TimingStats
+from .usage import Usage
+from .. import config, process
+from ..cache import CompileCache
 from ..output import *
 
 
+class Launched(object):
+    __slots__ = ("proc", "cgroup", "startTime", "baseline", "errors")
+
+    def __init__(self, proc, cgroup, startTime, baseline, errors):
+        self.proc = proc
+        self.cgroup = cgroup
+        self.startTime = startTime
+        self.baseline = baseline
+        self.errors = errors
+
+
 class Solution(object):
     compileTimeout = 10
+    cpuWallFactor = 2
+    allocationFailures = (b"bad_alloc", b"MemoryError", b"OutOfMemoryError", b"out of memory", b"memory allocation of", b"Cannot allocate memory", b"insufficient memory")
 
-    def __init__(self, name, timeout = 1000):
+    def __init__(self, name, timeout = 1000, timeMode = "wall", limits = None):
         self.timeout = timeout
+        self.timeMode = timeMode
+        self.limits = limits if limits is not None else Limits()
         baseName, extension = os.path.splitext(name)
         if extension not in config.providers:
             printError("Non valid provider in config")
@@ -33,9 +54,20 @@ class Solution(object):
             print("non valid solution no execFile and sourceFile")
             exit(141)
 
-    def internal_compile(self, flags):
+    def internal_compile(self, flags, useCache = True):
+        digests = dependency_digests(self.sourceFile)
+        cache = CompileCache()
+        if cache.enabled:
+            key = cache.key(self, flags, digests)
+            if useCache and cache.fetch(key, self.execFile):
+                record_dependencies(self.execFile, digests)
+                printInfo("Reused cached build of {}".format(self.sourceFile))
+                return True
+
+        if os.path.isfile(self.execFile) and os.stat(self.execFile).st_nlink > 1:
+            os.remove(self.execFile)
         try:
-            exitCode = call(self.info.query(self.sourceFile, self.execFile, flags).split(), timeout = self.compileTimeout)
+            exitCode = process.call(self.info.query(self.sourceFile, self.execFile, flags).split(), timeout = self.compileTimeout)
 
         except TimeoutExpired:
             printWarning("Compile timeout")
@@ -44,6 +76,9 @@ class Solution(object):
             exit(105)
 
         if exitCode == 0:
+            record_dependencies(self.execFile, digests)
+            if cache.enabled:
+                cache.store(key, self.execFile)
             if flags is None:
                 printInfo("Compiled {} with flags ".format(self.sourceFile) + " ".join(self.info.default_flags))
             else:
@@ -58,9 +93,9 @@ class Solution(object):
             return True
         if self.hasSource:
             if force or not self.hasExec:
-                return self.internal_compile(flags)
+                return self.internal_compile(flags, useCache = not force)
             else:
-                if os.path.getmtime(self.sourceFile) > os.path.getmtime(self.execFile):
+                if dependencies_changed(self.sourceFile, self.execFile):
                     return self.internal_compile(flags)
                 else:
                     if not auto:
@@ -70,14 +105,169 @@ class Solution(object):
             printError("No source file {}".format(self.sourceFile))
             return False
 
+    def wallTimeout(self):
+        if self.timeout is None:
+            return None
+        if self.timeMode == "cpu":
+            return self.timeout * Solution.cpuWallFactor + 1
+        return self.timeout
+
+    def isMLE(self, exitCode, peak, oomKilled, errors):
+        memory = self.limits.memory
+        if memory is None:
+            return False
+        if oomKilled or (peak is not None and peak > memory):
+            return True
+        return exitCode != 0 and any(failure in errors for failure in Solution.allocationFailures)
+
+    def _launch(self, stdin, stdout, outErr):
+        cgroup = self.limits.cgroup()
+        errors = None
+        if self.limits.memory is not None and cgroup is None and outErr == DEVNULL:
+            errRead, outErr = os.pipe()
+            errors = process.TailReader(errRead)
+        try:
+            if not self.limits.active():
+                startTime = time.perf_counter_ns()
+                proc = process.launch(self.prefix + self.execFile, stdin = stdin, stdout = stdout, stderr = outErr)
+            else:
+                proc = process.launch(self.prefix + self.execFile, stdin = stdin, stdout = stdout, stderr = outErr, stopped = True)
+                try:
+                    self.limits.apply(proc.pid, cgroup)
+                except BaseException:
+                    process.release(proc)
+                    proc.wait()
+                    raise
+                startTime = time.perf_counter_ns()
+                process.resume(proc)
+        except BaseException:
+            if cgroup is not None:
+                cgroup.remove()
+            raise
+        finally:
+            if errors is not None:
+                os.close(outErr)
+        # The child inherits hazmat's RSS high-water mark when it execs, so
+        # ru_maxrss only proves an MLE when it is above ours.
+        baseline = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return Launched(proc, cgroup, startTime, baseline, errors)
+
+    def _collect(self, launched, watchdog):
+        proc = launched.proc
+        cgroup = launched.cgroup
+        try:
+            _, waitStatus, rusage = os.wait4(proc.pid, 0)
+            endTime = time.perf_counter_ns()
+        except BaseException:
+            watchdog.kill()
+            proc.wait()
+            raise
+        finally:
+            watchdog.done()
+            oomKilled = False
+            peak = None
+            if cgroup is not None:
+                oomKilled = cgroup.oomKilled()
+                if cgroup.attached:
+                    peak = cgroup.peak()
+                cgroup.remove()
+
+        exitCode = process.exit_code(waitStatus)
+        proc.returncode = exitCode
+
+        if peak is None and rusage.ru_maxrss > launched.baseline:
+            peak = rusage.ru_maxrss * 1024
+        usage = Usage(wall = (endTime - launched.startTime) / 1e9, cpu = rusage.ru_utime + rusage.ru_stime, maxRss = rusage.ru_maxrss * 1024)
+        if watchdog.expired or (self.timeout is not None and usage.measured(self.timeMode) > self.timeout):
+            return RunStatus.TLE, usage
+        errors = b"" if launched.errors is None else launched.errors.tail()
+        if self.isMLE(exitCode, peak, oomKilled, errors):
+            return RunStatus.MLE, usage
+
+        return RunStatus(exitCode), usage
+
     def run(self, inFile, outFile, outErr = DEVNULL):
+        if self.limits.output is not None:
+            stdout = os.open(outFile, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+            try:
+                status, usage, _ = self.runPiped(inFile, lambda chunk: process.write_all(stdout, chunk), outErr)
+            finally:
+                os.close(stdout)
+            return status, usage
+
+        stdin = os.open(inFile, os.O_RDONLY)
         try:
-            startTime = time.time()
-            exitCode = call(self.prefix + self.execFile, stdin = open(inFile, "r"), stdout = open(outFile, "w"), stderr = outErr, timeout = self.timeout)
-            endTime = time.time()
-            durationTime = endTime - startTime
-            durationTime = round(durationTime, 2)
-        except TimeoutExpired:
-            return RunStatus.TLE, 0
+            stdout = os.open(outFile, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+        except BaseException:
+            os.close(stdin)
+            raise
+        try:
+            launched = self._launch(stdin, stdout, outErr)
+        finally:
+            os.close(stdin)
+            os.close(stdout)
+
+        watchdog = process.Watchdog(launched.proc, self.wallTimeout())
+        return self._collect(launched, watchdog)
+
+    def runPiped(self, input, consume, outErr = DEVNULL):
+        output = None
+        if self.limits.output is not None:
+            output = process.CappedOutput(consume, self.limits.output)
+            consume = output.write
+        if isinstance(input, str):
+            inRead, inWrite = os.open(input, os.O_RDONLY), None
+            input = b""
+        else:
+            inRead, inWrite = os.pipe()
+        outRead, outWrite = os.pipe()
+        try:
+            launched = self._launch(inRead, outWrite, outErr)
+        except BaseException:
+            if inWrite is not None:
+                os.close(inWrite)
+            os.close(outRead)
+            raise
+        finally:
+            os.close(inRead)
+            os.close(outWrite)
+
+        watchdog = process.Watchdog(launched.proc, self.wallTimeout())
+        try:
+            finished = process.exchange(input, inWrite, outRead, consume)
+        except BaseException:
+            watchdog.kill()
+            self._collect(launched, watchdog)
+            raise
+        if not finished:
+            watchdog.kill()
+        status, usage = self._collect(launched, watchdog)
+        if output is not None and output.exceeded:
+            status = RunStatus.OLE
+        return status, usage, finished
+
+    def runCompared(self, input, comparator, outErr = DEVNULL):
+        status, usage, finished = self.runPiped(input, comparator.feed, outErr)
+        if status == RunStatus.OLE:
+            return status, usage, False
+        if not finished:
+            return RunStatus.OK, usage, comparator.finish()
+        if status != RunStatus.OK:
+            return status, usage, False
+        return status, usage, comparator.finish()
+
+    def runRepeated(self, inFile, outFile, repeat = 1, warmup = 0, outErr = DEVNULL):
+        for _ in range(warmup):
+            status, usage = self.run(inFile, outFile, outErr)
+            if status != RunStatus.OK:
+                return status, usage, None
+
+        usages = []
+        for _ in range(repeat):
+            status, usage = self.run(inFile, outFile, outErr)
+            if status != RunStatus.OK:
+                return status, usage, None
+            usages.append(usage)
 
-        return RunStatus(exitCode), durationTime
+        stats = TimingStats([usage.measured(self.timeMode) for usage in usages])
+        return RunStatus.OK, usages[stats.medianIndex()], stats
@@ -0,0 +1,105 @@
+import math
+from array import array
+
+
+class TimingStats(object):
+    __slots__ = ("samples", "count", "median", "min", "mean", "stdev", "cv")
+
+    def __init__(self, samples):
+        import statistics
+        self.samples = array("d", samples)
+        self.count = len(self.samples)
+        self.median = statistics.median(self.samples)
+        self.min = min(self.samples)
+        self.mean = statistics.mean(self.samples)
+        self.stdev = statistics.stdev(self.samples) if self.count > 1 else 0.0
+        self.cv = self.stdev / self.mean if self.mean > 0 else 0.0
+
+    def medianIndex(self):
+        ordered = sorted(range(self.count), key = lambda index: self.samples[index])
+        return ordered[(self.count - 1) // 2]
+
+
+def t_quantile(p, df):
+    if df <= 0:
+        return float("inf")
+    if df == 1:
+        return math.tan(math.pi * (p - 0.5))
+    if df == 2:
+        return (2 * p - 1) * math.sqrt(2 / (4 * p * (1 - p)))
+    import statistics
+    z = statistics.NormalDist().inv_cdf(p)
+    return (z + (z ** 3 + z) / (4 * df)
+            + (5 * z ** 5 + 16 * z ** 3 + 3 * z) / (96 * df ** 2)
+            + (3 * z ** 7 + 19 * z ** 5 + 17 * z ** 3 - 15 * z) / (384 * df ** 3))
+
+
+class Speedup(object):
+    __slots__ = ("ratios", "speedup", "low", "high")
+    minTime = 1e-6
+
+    def fromSamples(old, new, confidence = 0.95):
+        return Speedup([math.log(max(a, Speedup.minTime)) - math.log(max(b, Speedup.minTime)) for a, b in zip(old, new)], confidence)
+
+    def __init__(self, ratios, confidence = 0.95):
+        import statistics
+        self.ratios = array("d", ratios)
+        mean = statistics.mean(self.ratios)
+        self.speedup = math.exp(mean)
+        if len(self.ratios) > 1:
+            margin = t_quantile((1 + confidence) / 2, len(self.ratios) - 1) * statistics.stdev(self.ratios) / math.sqrt(len(self.ratios))
+        else:
+            margin = float("inf")
+        self.low = math.exp(mean - margin)
+        self.high = math.exp(mean + margin)
+
+    def significant(self):
+        return self.low > 1 or self.high < 1
+
+
+class QuantileSketch(object):
+    __slots__ = ("counts", "count", "min", "max")
+    gamma = 1.02
+    minValue = 1e-6
+    size = 1200
+    logGamma = math.log(gamma)
+
+    def __init__(self):
+        self.counts = array("L", [0]) * QuantileSketch.size
+        self.count = 0
+        self.min = float("inf")
+        self.max = 0.0
+
+    def _index(self, value):
+        if value <= QuantileSketch.minValue:
+            return 0
+        return min(QuantileSketch.size - 1, math.ceil(math.log(value / QuantileSketch.minValue) / QuantileSketch.logGamma))
+
+    def add(self, value):
+        self.counts[self._index(value)] += 1
+        self.count += 1
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+
+    def quantile(self, q):
+        if self.count == 0:
+            return 0.0
+        rank = q * (self.count - 1)
+        seen = 0
+        for index, bucket in enumerate(self.counts):
+            seen += bucket
+            if seen > rank:
+                value = 2 * QuantileSketch.minValue * QuantileSketch.gamma ** index / (1 + QuantileSketch.gamma)
+                return min(self.max, max(self.min, value))
+        return self.max
+
+    def __iadd__(self, other):
+        for index, bucket in enumerate(other.counts):
+            if bucket:
+                self.counts[index] += bucket
+        self.count += other.count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        return self
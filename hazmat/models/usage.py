@@ -0,0 +1,19 @@
+class Usage(object):
+    __slots__ = ("wall", "cpu", "maxRss")
+
+    def __init__(self, wall = 0.0, cpu = 0.0, maxRss = 0):
+        self.wall = wall
+        self.cpu = cpu
+        self.maxRss = maxRss
+
+    def measured(self, timeMode):
+        if timeMode == "cpu":
+            return self.cpu
+        return self.wall
+
+    def __iadd__(self, other):
+        self.wall += other.wall
+        self.cpu += other.cpu
+        if self.maxRss is None or (other.maxRss is not None and other.maxRss > self.maxRss):
+            self.maxRss = other.maxRss
+        return self
@@ -1,26 +1,143 @@
 import os
-from subprocess import call, TimeoutExpired, DEVNULL
+import select
+import time
+from queue import Queue, Empty
+from subprocess import PIPE, TimeoutExpired, DEVNULL
+from threading import Lock
+from .compare import compare_tokens
+from .. import process
+from ..output import *
+
+
+class CheckerServerError(Exception):
+
+    def __init__(self, message):
+        super(CheckerServerError, self).__init__(message)
+
+
+class CheckerServer(object):
+
+    def __init__(self, callList):
+        self.callList = callList
+        self.proc = None
+        self.buffer = b""
+
+    def start(self):
+        self.proc = process.spawn(self.callList, stdin = PIPE, stdout = PIPE, stderr = DEVNULL)
+        self.buffer = b""
+
+    def alive(self):
+        return self.proc is not None and self.proc.poll() is None
+
+    def stop(self):
+        if self.proc is None:
+            return
+        try:
+            self.proc.stdin.close()
+        except OSError:
+            pass
+        try:
+            self.proc.wait(timeout = process.killGrace)
+        except TimeoutExpired:
+            pass
+        process.terminate(self.proc)
+        self.proc.stdout.close()
+        self.proc = None
+
+    def request(self, message, timeout):
+        if not self.alive():
+            self.start()
+        try:
+            self.proc.stdin.write(os.fsencode(message))
+            self.proc.stdin.flush()
+        except (BrokenPipeError, OSError):
+            raise CheckerServerError("checker exited")
+
+        fd = self.proc.stdout.fileno()
+        deadline = time.monotonic() + timeout
+        while b"\n" not in self.buffer:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise TimeoutExpired(self.callList, timeout)
+            ready, _, _ = select.select([fd], [], [], remaining)
+            if ready:
+                data = os.read(fd, 4096)
+                if not data:
+                    raise CheckerServerError("checker exited")
+                self.buffer += data
+
+        line, self.buffer = self.buffer.split(b"\n", 1)
+        return line.decode(errors = "replace").strip()
 
 
 class Validator:
     timeOut = 5
+    maxRestarts = 3
 
     def createFromArgs(args):
         if args["validator"]:
-            return Validator(needInput = args["inputneed"], checker = args["validator"], flags =[])
+            return Validator(needInput = args["inputneed"], checker = args["validator"], flags =[], server = args["validatorserver"], timeOut = args["validatortimeout"])
         else:
             return Validator()
 
-    def __init__(self, checker = "diff", flags = ["-wq"], needInput = False):
+    def __init__(self, checker = None, flags = [], needInput = False, server = False, timeOut = None):
 
         self.checker = checker
         self.flags = flags
         self.needInput = needInput
+        self.server = server
+        if timeOut is not None:
+            self.timeOut = timeOut
 
-    def validate(self, inFile, outFileTrue, outFileToVal):
-        inFile = os.path.realpath(inFile)
-        outFileTrue = os.path.realpath(outFileTrue)
-        outFileToVal = os.path.realpath(outFileToVal)
+        self.servers = Queue()
+        self.allServers = []
+        self.restarts = 0
+        self.lock = Lock()
+
+    def _acquire(self):
+        try:
+            return self.servers.get_nowait()
+        except Empty:
+            server = CheckerServer([self.checker] + self.flags)
+            with self.lock:
+                self.allServers.append(server)
+            return server
+
+    def _crashed(self, server, inFile, reason):
+        server.stop()
+        if process.closed():
+            return
+        with self.lock:
+            self.restarts += 1
+            if self.server and self.restarts > Validator.maxRestarts:
+                self.server = False
+                printWarning("Validator {} crashed {} times in a row, falling back to one-shot mode".format(self.checker, self.restarts))
+            else:
+                printWarning("Validator {} {} on test {}, restarting".format(self.checker, reason, inFile))
+
+    def validateServer(self, inFile, outFileTrue, outFileToVal):
+        paths = [inFile, outFileTrue, outFileToVal] if self.needInput else [outFileTrue, outFileToVal]
+        message = "".join(path + "\0" for path in paths)
+        for _attempt in range(2):
+            server = self._acquire()
+            try:
+                verdict = server.request(message, self.timeOut)
+            except TimeoutExpired:
+                self._crashed(server, inFile, "got timeout")
+                return False
+            except CheckerServerError as e:
+                self._crashed(server, inFile, e)
+                if not self.server:
+                    break
+                continue
+            finally:
+                self.servers.put(server)
+            with self.lock:
+                self.restarts = 0
+            return verdict.split()[:1] == ["OK"]
+        return self.validateOnce(inFile, outFileTrue, outFileToVal)
+
+    def validateOnce(self, inFile, outFileTrue, outFileToVal):
         callList = [self.checker]
         if self.needInput:
             callList.append(inFile)
@@ -29,7 +146,7 @@ class Validator:
         callList.extend(self.flags)
 
         try:
-            exitCode = call(callList, timeout = Validator.timeOut, stdout = DEVNULL, stderr = DEVNULL)
+            exitCode = process.call(callList, timeout = self.timeOut, stdout = DEVNULL, stderr = DEVNULL)
         except TimeoutExpired:
             print("Validator {} got timeout on test {}!".format(self.checker, inFile))
             return False
@@ -38,3 +155,19 @@ class Validator:
             return True
         else:
             return False
+
+    def validate(self, inFile, outFileTrue, outFileToVal):
+        if self.checker is None:
+            return compare_tokens(outFileTrue, outFileToVal)
+
+        inFile = os.path.abspath(inFile)
+        outFileTrue = os.path.abspath(outFileTrue)
+        outFileToVal = os.path.abspath(outFileToVal)
+        if self.server:
+            return self.validateServer(inFile, outFileTrue, outFileToVal)
+        return self.validateOnce(inFile, outFileTrue, outFileToVal)
+
+    def close(self):
+        for server in self.allServers:
+            server.stop()
+        self.allServers = []
@@ -1,19 +1,33 @@
-from . import (
-    live,
-    init,
-    run,
-    test,
-    compile,
-    generate,
-    merge)
+import importlib
+import sys
 
+# name, module, help, aliases
+COMMANDS = [
+    ("build", "compile", "Compile solution", []),
+    ("run", "run", "Run test options", []),
+    ("test", "test", "Test your solution on tests", ["check"]),
+    ("init", "init", "Init solving task here", []),
+    ("live", "live", "Live testing solution with validator and generator", []),
+    ("merge", "merge", "Eliminate local dependencies", []),
+    ("generate", "generate", "Live testing solution with validator and generator", []),
+    ("bench", "bench", "Compare speed of two solutions", []),
+]
+
+
+def requestedCommand(argv):
+    for arg in argv:
+        if not arg.startswith("-"):
+            return arg
+    return None
+
+
+def useAllModules(parser, argv = None):
+    if argv is None:
+        argv = sys.argv[1:]
+    requested = requestedCommand(argv)
 
-def useAllModules(parser):
     subParser = parser.add_subparsers()
-    compile.createSubParser(subParser)
-    run.createSubParser(subParser)
-    test.createSubParser(subParser)
-    init.createSubParser(subParser)
-    live.createSubParser(subParser)
-    merge.createSubParser(subParser)
-    generate.createSubParser(subParser)
+    for name, module, help, aliases in COMMANDS:
+        commandParser = subParser.add_parser(name, help = help, aliases = aliases)
+        if requested == name or requested in aliases:
+            importlib.import_module("." + module, __name__).createParser(commandParser)
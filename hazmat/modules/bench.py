@@ -0,0 +1,114 @@
+import os
+import statistics
+from ..models import Solution
+from ..models.limits import Limits
+from ..models.enums import RunStatus
+from ..models.stats import Speedup
+from ..utils import normalize_dir, positive_int, non_negative_int
+from .. import tmp_utils
+from ..output import *
+
+
+def createParser(benchParser):
+    solutionGroup = benchParser.add_argument_group("Solution options")
+    solutionGroup.add_argument(dest = "old", help = "Baseline solution")
+    solutionGroup.add_argument(dest = "new", help = "Solution compared to baseline")
+    solutionGroup.add_argument("--timeout", metavar = "sec", type = float, default = 5, help = "Maximum runtime of solution")
+    solutionGroup.add_argument("--time-mode", dest = "timemode", choices = ["cpu", "wall"], default = "wall", help = "Time compared between solutions")
+    solutionGroup.add_argument("--memory-limit", dest = "memorylimit", metavar = "MB", type = float, help = "Memory limit of solution")
+    solutionGroup.add_argument("--stack-limit", dest = "stacklimit", metavar = "MB", type = float, help = "Stack limit of solution")
+    solutionGroup.add_argument("--output-limit", dest = "outputlimit", metavar = "MB", type = float, help = "Output limit of solution")
+
+    benchParser.add_argument("--in-directory", "-in", help = "Directory of tests' inputs", default = "Tests/", dest = "inTestDir")
+
+    timingGroup = benchParser.add_argument_group("Timing options")
+    timingGroup.add_argument("--repeat", metavar = "K", type = positive_int, default = 5, help = "Measure every test K times")
+    timingGroup.add_argument("--warmup", metavar = "W", type = non_negative_int, default = 1, help = "Discarded runs before measuring")
+    timingGroup.add_argument("--confidence", type = float, default = 0.95, help = "Confidence level of intervals")
+
+    benchParser.add_argument("--print-level", dest = "print", type = int, default = 3)
+    benchParser.set_defaults(func = benchHandler)
+
+
+def benchTest(old, new, inFile, repeat, warmup, tmp):
+    samples = ([], [])
+    for iteration in range(warmup + repeat):
+        order = (0, 1) if iteration % 2 == 0 else (1, 0)
+        for index in order:
+            solution = (old, new)[index]
+            status, usage = solution.run(inFile, tmp)
+            if status != RunStatus.OK:
+                return None, (solution, status)
+            if iteration >= warmup:
+                samples[index].append(usage.measured(solution.timeMode))
+    return samples, None
+
+
+def strSpeedup(speedup):
+    return "x{:.3f} [{:.3f}, {:.3f}]".format(speedup.speedup, speedup.low, speedup.high)
+
+
+def printSpeedup(testName, speedup, oldTime = None, newTime = None):
+    if oldTime is not None:
+        times = strArrow("{:.3f} -> {:.3f}".format(oldTime, newTime))
+    else:
+        times = ""
+    if not speedup.significant():
+        print(strInfo("SAME   {}".format(testName)) + times + strArrow(strSpeedup(speedup)))
+    elif speedup.speedup > 1:
+        print(strSuccess("FASTER {}".format(testName)) + times + strArrow(strSpeedup(speedup)))
+    else:
+        print(strError("SLOWER {}".format(testName)) + times + strArrow(strSpeedup(speedup)))
+
+
+def benchHandler(args):
+    limits = Limits.createFromArgs(args)
+    old = Solution(name = args["old"], timeout = args["timeout"], timeMode = args["timemode"], limits = limits)
+    new = Solution(name = args["new"], timeout = args["timeout"], timeMode = args["timemode"], limits = limits)
+    for solution in (old, new):
+        if not solution.compile():
+            printError("Could not compile {}".format(solution.sourceFile))
+            exit(121)
+
+    if args["repeat"] < 2:
+        printError("Benchmark needs at least 2 repetitions")
+        exit(131)
+
+    inTestDir = normalize_dir(args["inTestDir"])
+    listTests = sorted(inTestDir + test for test in os.listdir(inTestDir) if test.endswith(".in") and os.path.isfile(inTestDir + test))
+    if len(listTests) == 0:
+        printError("No valid tests in {}".format(inTestDir))
+        exit(141)
+
+    tmp = tmp_utils.create()
+    confidence = args["confidence"]
+    printLevel = args["print"]
+    perTest = []
+    try:
+        for inFile in listTests:
+            samples, failure = benchTest(old, new, inFile, args["repeat"], args["warmup"], tmp)
+            if failure is not None:
+                solution, status = failure
+                if printLevel > 0:
+                    printError(status.name, end = "")
+                    printArrow("{} on {}".format(solution.sourceFile, inFile))
+                continue
+
+            oldSamples, newSamples = samples
+            speedup = Speedup.fromSamples(oldSamples, newSamples, confidence)
+            perTest.append(speedup)
+            if printLevel > 2 or (printLevel > 1 and speedup.significant()):
+                printSpeedup(inFile, speedup, min(oldSamples), min(newSamples))
+    except KeyboardInterrupt:
+        printInfo("Benchmark canceled due to KeyboardInterrupt")
+    finally:
+        if len(perTest) > 0:
+            print()
+            printInfo("Geometric mean over {} tests".format(len(perTest)))
+            aggregate = Speedup([statistics.mean(speedup.ratios) for speedup in perTest], confidence)
+            printSpeedup("{} vs {}".format(new.sourceFile, old.sourceFile), aggregate)
+            faster = sum(1 for speedup in perTest if speedup.significant() and speedup.speedup > 1)
+            slower = sum(1 for speedup in perTest if speedup.significant() and speedup.speedup < 1)
+            printSuccess("FASTER {}".format(faster), end = "")
+            printError("SLOWER {}".format(slower), end = "")
+            printInfo("SAME {}".format(len(perTest) - faster - slower))
@@ -2,21 +2,18 @@ from ..models import Solution
 from ..output import *
 
 
-def createSubParser(subParser):
-    compileParser = subParser.add_parser("build", help="Compile solution")
-    createParser(compileParser)
-
-
 def createParser(compileParser):
     compileParser.set_defaults(func = compileHandler)
     compileParser.add_argument(dest = "solution", help = "Solution of task")
     compileParser.add_argument('--force', '-f', action='store_true')
     compileParser.add_argument('--output', help = "Compiled version path", default = "")
     compileParser.add_argument('--flags', dest = "flags", default = None, help = "Optional flags to compiler")
+    compileParser.add_argument('--compile-timeout', dest = "compiletimeout", metavar = "sec", type = float, default = Solution.compileTimeout, help = "Maximal runtime of compiler")
 
 
 def compileHandler(args):
     solution = Solution(name = args["solution"], timeout = 10)
+    solution.compileTimeout = args["compiletimeout"]
     if not solution.info.need_compile:
         printInfo("No need to compile this file!")
 
@@ -1,27 +1,36 @@
 import os
 from ..models import Generator, Solution
+from ..models.limits import Limits
+from ..models.enums import RunStatus
+from ..models.generator import GeneratorError
+from ..models.usage import Usage
 from ..utils import normalize_dir
+from ..workers import WorkerPool
+from .. import process, tmp_utils, trace
 from ..output import *
 
 
-def createSubParser(subParser):
-    generateParser = subParser.add_parser("generate", help = "Live testing solution with validator and generator")
-    createParser(generateParser)
-
-
 def createParser(generateParser):
     solutionGroup = generateParser.add_argument_group("Solution options")
     solutionGroup.add_argument(dest = "solution", help = "Solution of task")
     solutionGroup.add_argument("--timeout", metavar = "sec", type = float, default = 5, help = "Maximum runtime of solution")
+    solutionGroup.add_argument("--time-mode", dest = "timemode", choices = ["cpu", "wall"], default = "wall", help = "Time used to decide TLE")
+    solutionGroup.add_argument("--memory-limit", dest = "memorylimit", metavar = "MB", type = float, help = "Memory limit of solution")
+    solutionGroup.add_argument("--stack-limit", dest = "stacklimit", metavar = "MB", type = float, help = "Stack limit of solution")
+    solutionGroup.add_argument("--output-limit", dest = "outputlimit", metavar = "MB", type = float, help = "Output limit of solution")
 
     generatorGroup = generateParser.add_argument_group("Generator options")
     generatorGroup.add_argument("--generator", help = "Generator executive", required = True)
     generatorGroup.add_argument("--message", "-m", dest = "generator_message", default = "", help = "This one goes to generator as stdin",)
+    generatorGroup.add_argument("--generator-timeout", dest = "generatortimeout", metavar = "sec", type = float, default = 10, help = "Maximal runtime of generator")
 
     testsGroup = generateParser.add_argument_group("Tests options")
     testsGroup.add_argument("--prefix", help = "Constant prefix of tests names", required = True)
     testsGroup.add_argument("--zero-fill", "-zfill", type = int, help = "Leftpad of tests names")
     testsGroup.add_argument("--range", type = int, required = True, nargs = 2)
+    testsGroup.add_argument("--jobs", "-j", metavar = "N", type = int, default = 1, help = "Number of tests generated in parallel")
+
+    generateParser.add_argument("--trace", metavar = "FILE", help = "Write Chrome trace of every phase to FILE")
 
     outputPlaceGroup = generateParser.add_mutually_exclusive_group()
     outputPlaceGroup.add_argument("--dir", help = "Directory to place inputs and outputs", default = "Tests/")
@@ -29,6 +38,27 @@ def createParser(generateParser):
     generateParser.set_defaults(func = generateHandler)
 
 
+def generateTest(solution, generator, test):
+    test_name, input_file, output_file = test
+    if os.path.isfile(input_file) or os.path.isfile(output_file):
+        return test_name, None, Usage(), None
+
+    input_part = tmp_utils.create(input_file + ".part")
+    output_part = tmp_utils.create(output_file + ".part")
+    try:
+        with trace.span("generate", test = test_name):
+            generator.generate(input_part)
+    except GeneratorError as e:
+        return test_name, RunStatus.UNKNOWN, Usage(), e
+
+    with trace.span("run", test = test_name):
+        exit_code, duration = solution.run(input_part, output_part)
+    if exit_code == RunStatus.OK:
+        os.replace(input_part, input_file)
+        os.replace(output_part, output_file)
+    return test_name, exit_code, duration, None
+
+
 def generateHandler(args):
     input_dir = args["dir"]
     output_dir = input_dir
@@ -49,22 +79,40 @@ def generateHandler(args):
         zero_fill = len(str(endPoint))
     else:
         zero_fill = args["zero_fill"]
-    solution = Solution(name = args["solution"], timeout = args["timeout"])
-    generator = Generator(name = args["generator"], message = args["generator_message"])
+    solution = Solution(name = args["solution"], timeout = args["timeout"], timeMode = args["timemode"], limits = Limits.createFromArgs(args))
+    generator = Generator(name = args["generator"], message = args["generator_message"], timeout = args["generatortimeout"])
+
+    tests = []
+    for test_id in range(startPoint, endPoint):
+        test_name = prefix + str(test_id).zfill(zero_fill)
+        tests.append((test_name, input_dir + test_name + ".in", output_dir + test_name + ".out"))
 
+    trace.start(args["trace"])
+    pool = WorkerPool(jobs = args["jobs"], tmpPerWorker = 0)
+    results = pool.imap(lambda test: generateTest(solution, generator, test), tests)
+    failed = 0
     try:
-        for test_id in range(startPoint, endPoint):
-            test_name = prefix + str(test_id).zfill(zero_fill)
-            input_file = input_dir + test_name + ".in"
-            output_file = output_dir + test_name + ".out"
-            if not os.path.isfile(input_file) and not os.path.isfile(output_file):
-                generator.generate(input_file)
-                exit_code, duration = solution.run(input_file, output_file)
-                if exit_code.value != 0:
-                    raise Exception("Wrong return code {}".format(exit_code.name))
+        for test_name, exit_code, duration, error in results:
+            with trace.span("output", test = test_name):
+                if exit_code is None:
+                    printInfo("Skipping {} due to filenames coverage".format(test_name))
+                elif error is not None:
+                    failed += 1
+                    printError(test_name, end = "")
+                    printArrow(error)
+                elif exit_code != RunStatus.OK:
+                    failed += 1
+                    printError("Wrong return code {}".format(exit_code.name), end = "")
+                    printArrow(test_name)
                 else:
                     printAC(test_name, duration)
-            else:
-                printInfo("Skipping {} due to filenames coverage".format(test_name))
     except KeyboardInterrupt:
+        process.kill_all()
         printInfo("Running test canceled due to KeyboardInterrupt")
+    finally:
+        with trace.span("cleanup"):
+            results.close()
+            pool.shutdown()
+        trace.save()
+    if failed > 0:
+        printError("Failed to generate {} tests".format(failed))
@@ -5,11 +5,6 @@ from .. import config
 from ..output import *
 
 
-def createSubParser(subParser):
-    initParser = subParser.add_parser("init", help="Init solving task here")
-    createParser(initParser)
-
-
 def createParser(initParser):
     initParser.add_argument("--path", help = "Path to initialization", default = "./")
     initParser.add_argument("name", help = "Name of solution")
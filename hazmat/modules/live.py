@@ -1,22 +1,27 @@
 import os
+import time
 from shutil import copyfile
 from ..utils import normalize_dir
 from ..output import *
 from ..models import Solution, Generator, Validator, ResultCounter
+from ..models.limits import Limits
 from ..models.enums import RunStatus
+from ..models.generator import GeneratorError
+from ..models.compare import mismatch_reason, CapturedOutput, OnlineComparator
 from ..progressbar import tqdm
-from .. import tmp_utils
-
-
-def createSubParser(subParser):
-    liveParser = subParser.add_parser("live", help = "Live testing solution with validator and generator")
-    createParser(liveParser)
+from ..workers import WorkerPool, worker_id
+from ..output.jsonl import ResultsWriter, verdict_name
+from .. import process, trace
 
 
 def createParser(liveParser):
     solutionGroup = liveParser.add_argument_group("Solution options")
     solutionGroup.add_argument(dest = "solution", help = "Solution of task")
     solutionGroup.add_argument("--timeout", "-t", metavar = "sec", help = "Maximal runtime of program", default = 5, type = float, dest="timeout")
+    solutionGroup.add_argument("--time-mode", dest = "timemode", choices = ["cpu", "wall"], default = "wall", help = "Time used to decide TLE")
+    solutionGroup.add_argument("--memory-limit", dest = "memorylimit", metavar = "MB", type = float, help = "Memory limit of solution")
+    solutionGroup.add_argument("--stack-limit", dest = "stacklimit", metavar = "MB", type = float, help = "Stack limit of solution")
+    solutionGroup.add_argument("--output-limit", dest = "outputlimit", metavar = "MB", type = float, help = "Output limit of solution")
 
     outputGroup = liveParser.add_argument_group("Output generator options")
     outputGroup.add_argument(dest = "used", help = "Solution to generate right outputs")
@@ -25,97 +30,205 @@ def createParser(liveParser):
     validatorGroup = liveParser.add_argument_group("Validation options")
     validatorGroup.add_argument("--validator", help = "Validation executive")
     validatorGroup.add_argument("--validator-need-input", dest = "inputneed", action = "store_true", help = "Validator requires input file")
+    validatorGroup.add_argument("--validator-server", dest = "validatorserver", action = "store_true", help = "Keep one validator process running and send it tests over stdin")
+    validatorGroup.add_argument("--validator-timeout", dest = "validatortimeout", metavar = "sec", type = float, default = 5, help = "Maximal runtime of validator per test")
+    validatorGroup.add_argument("--online-check", dest = "onlinecheck", action = "store_true", help = "Compare output while solution runs and kill it on first mismatch, implies --stream")
 
     liveParser.add_argument("--break", help="Break on first non-AC", action = "store_true")
+    liveParser.add_argument("--jobs", "-j", metavar = "N", type = int, default = 1, help = "Number of iterations run in parallel")
     liveParser.add_argument("--number-of-runs", "-n", dest = "num", help = "Numbers of tests to run", default = 10, type = int)
 
     generatorGroup = liveParser.add_argument_group("Generator options")
     generatorGroup.add_argument("--generator", "-gen", metavar = "GEN", help = "Generator executive", required = True)
     generatorGroup.add_argument("--message", "-m", help = "This one goes to generator as stdin", default = "")
+    generatorGroup.add_argument("--generator-timeout", dest = "generatortimeout", metavar = "sec", type = float, default = 10, help = "Maximal runtime of generator")
 
     printGroup = liveParser.add_argument_group("Printing options")
     printGroup.add_argument("--progressbar", help = "Show progressbar", action = "store_true")
     printGroup.add_argument("--summary", help = "Show summary", default = 0, type = int)
     printGroup.add_argument("--print-level", dest = "print", type = int, default = 3)
+    printGroup.add_argument("--results-jsonl", dest = "resultsjsonl", metavar = "PATH", help = "Stream one JSON record per iteration to PATH, - for stdout")
 
     liveParser.add_argument('--save', help="Saves non-AC tests in given dir", default = "")
+    liveParser.add_argument("--stream", action = "store_true", help = "Pass tests and outputs through pipes and compare them in memory")
+    liveParser.add_argument("--ram-io", dest = "ramio", action = "store_true", help = "Keep tests and outputs in memory files")
+    liveParser.add_argument("--trace", metavar = "FILE", help = "Write Chrome trace of every phase to FILE")
 
     liveParser.set_defaults(func = liveHandler)
 
 
+def liveIteration(solution, outputGenerator, generator, validator, saveDest, _i, test, wzo, unknow):
+    with trace.span("iteration", iteration = _i):
+        with trace.span("generate", iteration = _i):
+            generator.generate(test)
+        with trace.span("run", iteration = _i):
+            s1, d1 = solution.run(test, unknow)
+        with trace.span("brute run", iteration = _i):
+            s2, d2 = outputGenerator.run(test, wzo)
+        testName = str(_i) + ".in"
+
+        if s2 != RunStatus.OK:
+            return _i, testName, s1, d1, s2, False, 0.0, worker_id()
+        if s1 != RunStatus.OK:
+            if saveDest and not process.closed():
+                copyfile(test, saveDest + testName)
+            return _i, testName, s1, d1, s2, False, 0.0, worker_id()
+
+        with trace.span("validate", iteration = _i):
+            checkStart = time.perf_counter()
+            result = validator.validate(test, wzo, unknow)
+            checkTime = time.perf_counter() - checkStart
+        if not result and saveDest and not process.closed():
+            copyfile(test, saveDest + testName)
+        return _i, testName, s1, d1, s2, result, checkTime, worker_id()
+
+
+def writeBytes(fileName, data):
+    with open(fileName, "wb") as file:
+        file.write(data)
+
+
+def liveStreamIteration(solution, outputGenerator, generator, validator, saveDest, _i, test, wzo, unknow, online = False):
+    with trace.span("iteration", iteration = _i):
+        with trace.span("generate", iteration = _i):
+            data = generator.generateBytes()
+        expected = CapturedOutput(spillFile = wzo)
+        actual = CapturedOutput(spillFile = unknow)
+        try:
+            with trace.span("brute run", iteration = _i):
+                s2, d2, _ = outputGenerator.runPiped(data, expected.consume)
+            with trace.span("run", iteration = _i):
+                if online:
+                    s1, d1, result = solution.runCompared(data, OnlineComparator(expected.content()))
+                elif validator.checker is None:
+                    comparator = OnlineComparator(expected.content())
+                    s1, d1, _ = solution.runPiped(data, comparator.consume)
+                else:
+                    s1, d1, _ = solution.runPiped(data, actual.consume)
+            testName = str(_i) + ".in"
+
+            if s2 != RunStatus.OK:
+                return _i, testName, s1, d1, s2, False, 0.0, worker_id()
+            if s1 != RunStatus.OK:
+                if saveDest and not process.closed():
+                    writeBytes(saveDest + testName, data)
+                return _i, testName, s1, d1, s2, False, 0.0, worker_id()
+
+            if online:
+                if not result and saveDest and not process.closed():
+                    writeBytes(saveDest + testName, data)
+                return _i, testName, s1, d1, s2, result, 0.0, worker_id()
+
+            with trace.span("validate", iteration = _i):
+                checkStart = time.perf_counter()
+                if validator.checker is None:
+                    result = comparator.finish()
+                else:
+                    writeBytes(test, data)
+                    expected.store(wzo)
+                    actual.store(unknow)
+                    result = validator.validate(test, wzo, unknow)
+                checkTime = time.perf_counter() - checkStart
+            if not result and saveDest and not process.closed():
+                writeBytes(saveDest + testName, data)
+            return _i, testName, s1, d1, s2, result, checkTime, worker_id()
+        finally:
+            expected.close()
+            actual.close()
+
+
 def liveHandler(args):
     breakOnWA = args['break']
-    solution = Solution(name = args["solution"], timeout = args["timeout"])
-    outputGenerator = Solution(name = args["used"], timeout = args["timeoutchecker"])
+    solution = Solution(name = args["solution"], timeout = args["timeout"], timeMode = args["timemode"], limits = Limits.createFromArgs(args))
+    outputGenerator = Solution(name = args["used"], timeout = args["timeoutchecker"], timeMode = args["timemode"])
     progressbar = args["progressbar"]
     printLevel = args["print"]
     showSummary = (args["summary"] > 0)
+    trace.start(args["trace"])
 
-    if not solution.compile():
+    with trace.span("compile", solution = args["solution"]):
+        compiled = solution.compile()
+    if not compiled:
+        trace.save()
         exit(103)
 
     validator = Validator.createFromArgs(args)
     counter = ResultCounter("LIVE", store = showSummary)
 
-    generator = Generator(name = args["generator"], message = args["message"])
+    generator = Generator(name = args["generator"], message = args["message"], timeout = args["generatortimeout"])
 
     n = args["num"]
-    test = tmp_utils.create()
-    wzo = tmp_utils.create()
-    unknow = tmp_utils.create()
-    saveNonAC = False
     saveDest = ""
     if args["save"] != "":
-        saveNonAC = True
         saveDest = normalize_dir(args['save'])
         if not os.path.isdir(saveDest):
             printError("Given non-AC save point does't exit")
             exit(101)
 
+    resultsWriter = None
+    if args["resultsjsonl"] is not None:
+        resultsWriter = ResultsWriter(args["resultsjsonl"])
+
+    online = args["onlinecheck"]
+    if online and validator.checker is not None:
+        printWarning("--online-check works only with built-in comparison, ignoring it")
+        online = False
+
+    pool = WorkerPool(jobs = args["jobs"], tmpPerWorker = 3, ram = args["ramio"])
+    if online:
+        results = pool.imap(lambda _i, test, wzo, unknow: liveStreamIteration(solution, outputGenerator, generator, validator, saveDest, _i, test, wzo, unknow, online = True), range(n))
+    else:
+        iteration = liveStreamIteration if args["stream"] else liveIteration
+        results = pool.imap(lambda _i, test, wzo, unknow: iteration(solution, outputGenerator, generator, validator, saveDest, _i, test, wzo, unknow), range(n))
     if progressbar:
-        testYield = tqdm(range(n))
+        testYield = tqdm(results, total = n)
         print_func = testYield.write
     else:
-        testYield = range(n)
+        testYield = results
         print_func = print
 
     try:
-        for _i in testYield:
-            generator.generate(test)
-            if progressbar:
-                testYield.set_description("Number {}".format(_i))
-            s1, d1 = solution.run(test, unknow)
-            s2, d2 = outputGenerator.run(test, wzo)
-            testName = str(_i) + ".in"
-
-            if s2 != RunStatus.OK:
-                printError("Checker fucked up with {} on {}".format(s2, _i))
-                continue
-            if s1 != RunStatus.OK:
-                if saveNonAC:
-                    copyfile(test, saveDest, testName)
-                if printLevel > 0:
-                    counter.addError(testName, d1, s1)
-                    print_func(strTLE(testName) if s1 == RunStatus.TLE else strExc(s1, testName))
-                continue
-
-            result = validator.validate(test, wzo, unknow)
-            counter.addResult(testName, d1, result)
-
-            if result and printLevel > 2:
-                print_func(strAC(testName, d1))
-            elif not result and printLevel > 1:
-                print_func(strWA(testName, d1))
-
-            if not result:
-                if saveNonAC:
-                    copyfile(test, saveDest + str(_i) + ".in")
-                if breakOnWA:
+        for _i, testName, s1, d1, s2, result, checkTime, workerId in testYield:
+            with trace.span("output", iteration = _i):
+                if resultsWriter is not None:
+                    verdict = "BRUTE_" + s2.name if s2 != RunStatus.OK else verdict_name(s1, bool(result))
+                    resultsWriter.write(testName, verdict, d1, checkTime, workerId)
+                if progressbar:
+                    testYield.set_description("Number {}".format(_i))
+
+                if s2 != RunStatus.OK:
+                    printError("Checker fucked up with {} on {}".format(s2, _i))
+                    continue
+                if s1 != RunStatus.OK:
+                    if printLevel > 0:
+                        counter.addError(testName, d1, s1)
+                        print_func(strFailure(s1, testName))
+                    continue
+
+                counter.addResult(testName, d1, bool(result))
+
+                if result and printLevel > 2:
+                    print_func(strAC(testName, d1))
+                elif not result and printLevel > 1:
+                    print_func(strWA(testName, d1, mismatch_reason(result)))
+
+                if not result and breakOnWA:
+                    process.kill_all()
                     break
         print()
+    except GeneratorError as e:
+        printError(e)
     except KeyboardInterrupt:
+        process.kill_all()
         printInfo("Running test canceled due to KeyboardInterrupt")
     finally:
+        with trace.span("cleanup"):
+            results.close()
+            pool.shutdown()
+            validator.close()
+            if resultsWriter is not None:
+                resultsWriter.close()
         counter.status()
         if showSummary:
             counter.summary(args["summary"])
+        trace.save()
@@ -1,13 +1,13 @@
 import os
-import subprocess
 from ..models import Solution
+from .. import process
 from ..output import *
 
 
 def merge(solution, output, command, flags):
     callList = command.format(solution, output, flags).split()
     try:
-        exit_code = subprocess.call(callList)
+        exit_code = process.call(callList)
     except KeyboardInterrupt:
         printInfo("Running test canceled due to KeyboardInterrupt")
         exit(105)
@@ -16,11 +16,6 @@ def merge(solution, output, command, flags):
         raise Exception("Preprcessor error")
 
 
-def createSubParser(subParser):
-    mergeParser = subParser.add_parser("merge", help = "Eliminate local dependencies")
-    createParser(mergeParser)
-
-
 def createParser(mergeParser):
     mergeParser.set_defaults(func = mergeHandler)
     mergeParser.add_argument(dest = "solution", help = "Solution of task")
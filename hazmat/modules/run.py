@@ -1,20 +1,21 @@
 import os
 from ..models import Solution, Validator
+from ..models.limits import Limits
 from ..models.enums import RunStatus
+from ..models.compare import mismatch_reason
 from ..utils import printFile
 from .. import tmp_utils
 from ..output import *
 
 
-def createSubParser(subParser):
-    runParser = subParser.add_parser("run", help="Run test options")
-    createParser(runParser)
-
-
 def createParser(runParser):
     solutionGroup = runParser.add_argument_group("Solution options")
     solutionGroup.add_argument(dest = "solution", help = "Solution of task")
     solutionGroup.add_argument("--timeout", "-t", metavar = "sec", help = "Maximal runtime of program", default = 5, type = float, dest="timeout")
+    solutionGroup.add_argument("--time-mode", dest = "timemode", choices = ["cpu", "wall"], default = "wall", help = "Time used to decide TLE")
+    solutionGroup.add_argument("--memory-limit", dest = "memorylimit", metavar = "MB", type = float, help = "Memory limit of solution")
+    solutionGroup.add_argument("--stack-limit", dest = "stacklimit", metavar = "MB", type = float, help = "Stack limit of solution")
+    solutionGroup.add_argument("--output-limit", dest = "outputlimit", metavar = "MB", type = float, help = "Output limit of solution")
 
     runParser.add_argument(dest = "inFile", help = "Input file")
     runParser.add_argument("--out", dest = "outFile", default = "", help = "Output file")
@@ -24,6 +25,8 @@ def createParser(runParser):
     validatorGroup = runParser.add_argument_group("Validation options")
     validatorGroup.add_argument("--validator", help = "Validation executive")
     validatorGroup.add_argument("--validator-need-input", dest = "inputneed", action = "store_true", help= "Validator requires input file")
+    validatorGroup.add_argument("--validator-server", dest = "validatorserver", action = "store_true", help = "Keep one validator process running and send it tests over stdin")
+    validatorGroup.add_argument("--validator-timeout", dest = "validatortimeout", metavar = "sec", type = float, default = 5, help = "Maximal runtime of validator per test")
 
     runParser.set_defaults(func = runHandler)
 
@@ -31,7 +34,7 @@ def createParser(runParser):
 def runHandler(args):
     validator = Validator.createFromArgs(args)
     tmp = tmp_utils.create()
-    solution = Solution(name = args["solution"], timeout = args["timeout"])
+    solution = Solution(name = args["solution"], timeout = args["timeout"], timeMode = args["timemode"], limits = Limits.createFromArgs(args))
     if not solution.compile() and not solution.hasExec:
         printError("Cannot create binary and no binary avaible")
         exit(121)
@@ -58,7 +61,7 @@ def runHandler(args):
 
     if status != RunStatus.OK:
         printError(status.name, end = "")
-        printTime(duration)
+        printUsage(duration)
         if show_input:
             printInfo("Input")
             printFile(inFile)
@@ -66,11 +69,12 @@ def runHandler(args):
 
     if os.path.isfile(outFile):
 
-        result = validator.validate(inFile, tmp, outFile)
+        result = validator.validate(inFile, outFile, tmp)
+        validator.close()
         if result:
             printAC(inFile, duration)
         else:
-            printWA(inFile, duration)
+            printWA(inFile, duration, mismatch_reason(result))
 
         if show_input:
             printInfo("Input")
@@ -87,6 +91,6 @@ def runHandler(args):
                 printFile(outFile)
     else:
         printInfo(inFile, end="")
-        printTime(duration)
+        printUsage(duration)
         if show_output:
             printFile(tmp)
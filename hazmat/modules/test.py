@@ -1,21 +1,28 @@
+import shutil
+import time
 from ..models import Solution, Validator
-from ..utils import normalize_dir, subtree_dirs, get_parrarel_tests
+from ..models.limits import Limits
+from ..utils import normalize_dir, subtree_dirs, get_parrarel_tests, positive_int, non_negative_int
 from ..models.enums import RunStatus
 from ..models.counter import ResultCounter
-from .. import tmp_utils
+from ..models.compare import mismatch_reason, OnlineComparator
+from ..workers import WorkerPool, worker_id
+from ..cache import ResultCache
+from ..history import TestHistory
+from .. import process, trace
 from ..progressbar import tqdm
+from ..output.jsonl import ResultsWriter, verdict_name
 from ..output import *
 
 
-def createSubParser(subParser):
-    testParser = subParser.add_parser("test", help="Test your solution on tests", aliases = ['check'])
-    createParser(testParser)
-
-
 def createParser(testParser):
     solutionGroup = testParser.add_argument_group("Solution options")
     solutionGroup.add_argument(dest = "solution", help = "Solution of task")
     solutionGroup.add_argument("--timeout", metavar = "sec", type = float, help = "Maximum runtime of solution")
+    solutionGroup.add_argument("--time-mode", dest = "timemode", choices = ["cpu", "wall"], default = "wall", help = "Time used to decide TLE")
+    solutionGroup.add_argument("--memory-limit", dest = "memorylimit", metavar = "MB", type = float, help = "Memory limit of solution")
+    solutionGroup.add_argument("--stack-limit", dest = "stacklimit", metavar = "MB", type = float, help = "Stack limit of solution")
+    solutionGroup.add_argument("--output-limit", dest = "outputlimit", metavar = "MB", type = float, help = "Output limit of solution")
 
     testParser.add_argument("--in-directory", "-in", help = "Directory of tests' inputs", default= "Tests/", dest = "inTestDir")
     testParser.add_argument("--out-directory", "-out", help="Directory of tests' outputs", default="", dest = "outTestDir")
@@ -23,47 +30,133 @@ def createParser(testParser):
     validatorGroup = testParser.add_argument_group("Validation options")
     validatorGroup.add_argument("--validator", help = "Validation executive")
     validatorGroup.add_argument("--validator-need-input", dest = "inputneed", action = "store_true", help= "Validator requires input file")
+    validatorGroup.add_argument("--validator-server", dest = "validatorserver", action = "store_true", help = "Keep one validator process running and send it tests over stdin")
+    validatorGroup.add_argument("--validator-timeout", dest = "validatortimeout", metavar = "sec", type = float, default = 5, help = "Maximal runtime of validator per test")
+    validatorGroup.add_argument("--online-check", dest = "onlinecheck", action = "store_true", help = "Compare output while solution runs and kill it on first mismatch")
 
     printGroup = testParser.add_argument_group("Printing options")
     printGroup.add_argument("--progressbar", help = "Show progressbar", action = "store_true")
     printGroup.add_argument("--summary", help="Show summary", default = 0, type = int)
     printGroup.add_argument("--print-level", dest= "print", type = int, default = 3)
+    printGroup.add_argument("--results-jsonl", dest = "resultsjsonl", metavar = "PATH", help = "Stream one JSON record per test to PATH, - for stdout")
 
     testParser.add_argument("--walk", action = "store_true", help = "Walk symetric reqursive through directory")
     testParser.add_argument("--break", action = "store_true", help = "Break on first error")
+    testParser.add_argument("--jobs", "-j", metavar = "N", type = int, default = 1, help = "Number of tests run in parallel")
+    testParser.add_argument("--ram-io", dest = "ramio", action = "store_true", help = "Keep inputs and outputs of solution in memory files")
+    testParser.add_argument("--trace", metavar = "FILE", help = "Write Chrome trace of every phase to FILE")
+
+    timingGroup = testParser.add_argument_group("Timing options")
+    timingGroup.add_argument("--repeat", metavar = "K", type = positive_int, default = 1, help = "Measure every test K times")
+    timingGroup.add_argument("--warmup", metavar = "W", type = non_negative_int, default = 0, help = "Discarded runs before measuring")
+
+    orderGroup = testParser.add_mutually_exclusive_group()
+    orderGroup.add_argument("--failed-first", dest = "failedfirst", action = "store_true", help = "Run tests failed or changed since last run first")
+    orderGroup.add_argument("--only-failed", dest = "onlyfailed", action = "store_true", help = "Run only tests failed or changed since last run")
+
+    cacheGroup = testParser.add_argument_group("Cache options")
+    cacheGroup.add_argument("--cache", action = "store_true", help = "Reuse verdicts of unchanged tests")
+    cacheGroup.add_argument("--no-cache", dest = "nocache", action = "store_true", help = "Ignore the verdict cache even if --cache is given")
+    cacheGroup.add_argument("--cache-size", dest = "cachesize", metavar = "N", type = positive_int, default = ResultCache.maxEntries, help = "Maximal number of cached verdicts")
     testParser.set_defaults(func = testHandler)
 
 
-def runTests(solution, validator, listTests, counter, breakOnError = False, progressbar = False, printLevel = 0):
+def runTest(solution, validator, test, tmp, cache = None, repeat = 1, warmup = 0, online = False, ramIn = None):
+    inFile, outFile = test
+    key = None
+    if cache is not None:
+        with trace.span("cache", test = inFile):
+            key = cache.key(inFile, outFile)
+            cached = cache.get(key)
+        if cached is not None:
+            status, duration, res = cached
+            return inFile, outFile, status, duration, res, None, key, True, 0.0, worker_id()
+
+    runIn = inFile
+    if ramIn is not None:
+        with trace.span("preload", test = inFile):
+            shutil.copyfile(inFile, ramIn)
+        runIn = ramIn
+
+    if online:
+        comparator = OnlineComparator.createFromFile(outFile)
+        try:
+            with trace.span("run", test = inFile):
+                status, duration, res = solution.runCompared(runIn, comparator)
+        finally:
+            comparator.close()
+        return inFile, outFile, status, duration, res, None, key, False, 0.0, worker_id()
+
+    stats = None
+    with trace.span("run", test = inFile):
+        if repeat > 1 or warmup > 0:
+            status, duration, stats = solution.runRepeated(runIn, tmp, repeat = repeat, warmup = warmup)
+        else:
+            status, duration = solution.run(runIn, tmp)
+    res = False
+    checkTime = 0.0
+    if status == RunStatus.OK:
+        with trace.span("validate", test = inFile):
+            checkStart = time.perf_counter()
+            res = validator.validate(inFile, outFile, tmp)
+            checkTime = time.perf_counter() - checkStart
+    return inFile, outFile, status, duration, res, stats, key, False, checkTime, worker_id()
+
+
+def runTests(solution, validator, listTests, counter, breakOnError = False, progressbar = False, printLevel = 0, pool = None, cache = None, history = None, schedule = True, repeat = 1, warmup = 0, online = False, results = None):
 
-    tmp = tmp_utils.create()
+    if pool is None:
+        pool = WorkerPool()
+    order = None
+    if history is not None and schedule and pool.jobs > 1:
+        order = history.schedule(listTests)
+    outcomes = pool.imap(lambda test, tmp, *ramIn: runTest(solution, validator, test, tmp, cache, repeat, warmup, online, *ramIn), listTests, order = order)
     if progressbar:
-        gen = tqdm(listTests)
+        gen = tqdm(outcomes, total = len(listTests))
         print_func = gen.write
     else:
-        gen = listTests
+        gen = outcomes
         print_func = print
 
-    for inFile, outFile in gen:
-        if progressbar:
-            gen.set_description(inFile)
-        status, duration = solution.run(inFile, tmp)
-        if status == RunStatus.OK:
-            res = validator.validate(inFile, outFile, tmp)
-            counter.addResult(inFile, duration, res)
-            if res and printLevel > 2:
-                print_func(strAC(inFile, duration))
-            elif not res and printLevel > 1:
-                print_func(strWA(inFile, duration))
-
-            if breakOnError:
-                return False
-        else:
-            counter.addError(inFile, duration, status)
-            if printLevel > 0:
-                print_func(strTLE(inFile) if status == RunStatus.TLE else strExc(status, inFile))
-            if breakOnError:
-                return False
+    try:
+        for inFile, outFile, status, duration, res, stats, key, cached, checkTime, workerId in gen:
+            with trace.span("output", test = inFile):
+                if results is not None:
+                    results.write(inFile, verdict_name(status, bool(res)), duration, checkTime, workerId, cached)
+                if progressbar:
+                    gen.set_description(inFile)
+                if history is not None:
+                    history.recordVerdict(inFile, outFile, status == RunStatus.OK and bool(res))
+                if cached:
+                    counter.addCached()
+                else:
+                    if cache is not None:
+                        cache.put(key, status, duration, res)
+                    if history is not None:
+                        history.record(inFile, duration.wall)
+                mark = strInfo("cached") if cached else ""
+                if stats is not None:
+                    counter.addTiming(inFile, stats)
+                    mark = strStats(stats)
+                if status == RunStatus.OK:
+                    counter.addResult(inFile, duration, bool(res))
+                    if res and printLevel > 2:
+                        print_func(strAC(inFile, duration) + mark)
+                    elif not res and printLevel > 1:
+                        print_func(strWA(inFile, duration, mismatch_reason(res)) + mark)
+
+                    if breakOnError and not res:
+                        process.kill_all()
+                        return False
+                else:
+                    counter.addError(inFile, duration, status)
+                    if printLevel > 0:
+                        print_func(strFailure(status, inFile) + mark)
+                    if breakOnError:
+                        process.kill_all()
+                        return False
+    finally:
+        outcomes.close()
     return True
 
 
@@ -75,24 +168,50 @@ def testHandler(args):
     outTestDir = normalize_dir(args["outTestDir"])
     progressbar = args["progressbar"]
 
-    solution = Solution(name = args["solution"], timeout = args["timeout"])
+    solution = Solution(name = args["solution"], timeout = args["timeout"], timeMode = args["timemode"], limits = Limits.createFromArgs(args))
     validator = Validator.createFromArgs(args)
 
-    if not solution.compile():
+    trace.start(args["trace"])
+    with trace.span("compile", solution = args["solution"]):
+        compiled = solution.compile()
+    if not compiled:
         printError("Could not compile solution")
+        trace.save()
         exit(121)
 
+    online = args["onlinecheck"]
+    if online and validator.checker is not None:
+        printWarning("--online-check works only with built-in comparison, ignoring it")
+        online = False
+    if online and (args["repeat"] > 1 or args["warmup"] > 0):
+        printWarning("--online-check does not measure repeated runs, ignoring it")
+        online = False
+
     listDir = subtree_dirs(inTestDir) if args['walk'] else [inTestDir]
 
     showSummary = (args["summary"] > 0)
     counter = ResultCounter(args["inTestDir"], store = showSummary)
+    pool = WorkerPool(jobs = args["jobs"], tmpPerWorker = 2 if args["ramio"] else 1, ram = args["ramio"])
+    cache = None
+    if args["cache"] and not args["nocache"] and args["repeat"] <= 1 and args["warmup"] <= 0:
+        cache = ResultCache(solution, validator, maxEntries = args["cachesize"])
+    history = TestHistory()
+    results = None
+    if args["resultsjsonl"] is not None:
+        results = ResultsWriter(args["resultsjsonl"])
     try:
         for curInDir in listDir:
             printInfo("Running folder " + curInDir)
             curOutDir = outTestDir + curInDir[len(inTestDir):]
             listTests = sorted(get_parrarel_tests(curInDir, curOutDir))
+            prioritized = args["failedfirst"] or args["onlyfailed"]
+            if prioritized and len(listTests) > 0:
+                listTests = history.prioritize(listTests, onlyFailed = args["onlyfailed"])
+                if len(listTests) == 0:
+                    printInfo("No failed or changed tests in {}".format(curInDir))
+                    continue
             if len(listTests) > 0:
-                con = runTests(solution, validator, listTests, counter, breakOnError = args["break"], progressbar = progressbar, printLevel = args["print"])
+                con = runTests(solution, validator, listTests, counter, breakOnError = args["break"], progressbar = progressbar, printLevel = args["print"], pool = pool, cache = cache, history = history, schedule = not prioritized, repeat = args["repeat"], warmup = args["warmup"], online = online, results = results)
                 if not con:
                     printError("Breaking on RE or WA")
                     break
@@ -102,9 +221,19 @@ def testHandler(args):
                 print()
         print()
     except KeyboardInterrupt:
+        process.kill_all()
         print()
         printInfo("Running tests canceled due to KeyboardInterrupt")
     finally:
+        with trace.span("cleanup"):
+            pool.shutdown()
+            validator.close()
+            if cache is not None:
+                cache.save()
+            history.save()
+            if results is not None:
+                results.close()
         counter.status()
         if showSummary:
             counter.summary(args["summary"])
+        trace.save()
@@ -5,15 +5,16 @@ from .. import modules
 
 class OptionsDispacher:
 
-    def __init__(self):
+    def __init__(self, argv = None):
 
+        self.argv = sys.argv[1:] if argv is None else argv
         self.parser = argparse.ArgumentParser(prog="HazMAT", description="Run, Test and Solve Tasks")
         self.parser.add_argument('--version', action='version', version='%(prog)s build 0.1')
-        modules.useAllModules(self.parser)
+        modules.useAllModules(self.parser, self.argv)
 
     def run(self):
-        arg = self.parser.parse_args()
+        arg = self.parser.parse_args(self.argv)
         if arg.__contains__("func"):
             arg.func(vars(arg))
-        if len(sys.argv) < 2:
+        if len(self.argv) < 1:
             self.parser.print_help()
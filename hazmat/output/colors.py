@@ -45,6 +45,23 @@ def strTime(message):
     return "\x1b[{0}m {1:.2f} \x1b[0m".format(ColorTime, message)
 
 
+def printUsage(usage, end = "\n"):
+    print(strUsage(usage), end = end)
+
+
+def strUsage(usage):
+    memory = "?" if usage.maxRss is None else "{:.1f}".format(usage.maxRss / 2**20)
+    return "\x1b[{0}m {1:.3f} cpu {2:.3f} wall {3} MB \x1b[0m".format(ColorTime, usage.cpu, usage.wall, memory)
+
+
+def printStats(stats, end = "\n"):
+    print(strStats(stats), end = end)
+
+
+def strStats(stats):
+    return "\x1b[{0}m median {1:.3f} min {2:.3f} sd {3:.3f} cv {4:.1f}% \x1b[0m".format(ColorTime, stats.median, stats.min, stats.stdev, stats.cv * 100)
+
+
 def printArrow(message, end = "\n"):
     print(strArrow(message), end = end)
 
@@ -58,12 +75,14 @@ def printCustom(message, style, fg, bg, end = "\n"):
     print("\x1b[{}m {} \x1b[0m".format(form, message))
 
 
-def printWA(testName, durationTime):
-    print(strWA(testName, durationTime))
+def printWA(testName, durationTime, reason = None):
+    print(strWA(testName, durationTime, reason))
 
 
-def strWA(testName, durationTime):
-    return strError("WA {}".format(testName)) + strTime(durationTime)
+def strWA(testName, durationTime, reason = None):
+    if reason is None:
+        return strError("WA {}".format(testName)) + strUsage(durationTime)
+    return strError("WA {}".format(testName)) + strUsage(durationTime) + strArrow(reason)
 
 
 def printAC(testName, durationTime):
@@ -71,7 +90,7 @@ def printAC(testName, durationTime):
 
 
 def strAC(testName, durationTime):
-    return strSuccess("AC {}".format(testName)) + strTime(durationTime)
+    return strSuccess("AC {}".format(testName)) + strUsage(durationTime)
 
 
 def printTLE(testName):
@@ -82,9 +101,39 @@ def strTLE(testName):
     return strWarning("TLE  ") + strArrow(testName)
 
 
+def printMLE(testName):
+    print(strMLE(testName))
+
+
+def strMLE(testName):
+    return strWarning("MLE  ") + strArrow(testName)
+
+
+def printOLE(testName):
+    print(strOLE(testName))
+
+
+def strOLE(testName):
+    return strWarning("OLE  ") + strArrow(testName)
+
+
 def printExc(status, testName):
     print(strExc(status, testName))
 
 
 def strExc(status, testName):
     return strError(status.name) + strArrow(testName)
+
+
+def printFailure(status, testName):
+    print(strFailure(status, testName))
+
+
+def strFailure(status, testName):
+    if status.name == "TLE":
+        return strTLE(testName)
+    if status.name == "MLE":
+        return strMLE(testName)
+    if status.name == "OLE":
+        return strOLE(testName)
+    return strExc(status, testName)
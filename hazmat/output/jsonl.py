@@ -0,0 +1,69 @@
+import json
+import sys
+from threading import Lock
+from ..models.enums import RunStatus
+from .. import process
+
+
+def verdict_name(status, success):
+    if status == RunStatus.OK:
+        return "AC" if success else "WA"
+    return status.name
+
+
+class ResultsWriter(object):
+    batchSize = 512
+    flushInterval = 1.0
+
+    def __init__(self, path):
+        self.path = path
+        if path == "-":
+            self.file = sys.stdout
+        else:
+            self.file = open(path, "w")
+        self.buffer = []
+        self.lock = Lock()
+        self.timer = None
+        self.closed = False
+
+    def write(self, testName, verdict, usage, checkTime = 0.0, workerId = 0, cached = False):
+        record = {
+            "test": testName,
+            "verdict": verdict,
+            "cpu": round(usage.cpu, 6),
+            "wall": round(usage.wall, 6),
+            "maxRss": usage.maxRss,
+            "checkTime": round(checkTime, 6),
+            "worker": workerId,
+        }
+        if cached:
+            record["cached"] = True
+        line = json.dumps(record)
+        with self.lock:
+            self.buffer.append(line)
+            if len(self.buffer) >= ResultsWriter.batchSize:
+                self._flush()
+            elif self.timer is None:
+                self.timer = process.schedule(ResultsWriter.flushInterval, self.flush)
+
+    def _flush(self):
+        if self.timer is not None:
+            process.cancel(self.timer)
+            self.timer = None
+        if self.closed:
+            return
+        if len(self.buffer) > 0:
+            self.file.write("\n".join(self.buffer) + "\n")
+            self.buffer = []
+        self.file.flush()
+
+    def flush(self):
+        with self.lock:
+            self._flush()
+
+    def close(self):
+        with self.lock:
+            self._flush()
+            self.closed = True
+        if self.file is not sys.stdout:
+            self.file.close()
@@ -0,0 +1,407 @@
+import heapq
+import itertools
+import os
+import selectors
+import signal
+import time
+from subprocess import Popen, TimeoutExpired, DEVNULL
+from threading import Condition, Lock, Thread
+
+killGrace = 0.5
+readSize = 1 << 16
+
+_lock = Lock()
+_groups = set()
+_closed = False
+_devnull = None
+_environment = None
+_stopper = ("/bin/sh", "-c", 'kill -STOP $$ && exec "$@"', "hazmat")
+_restoredSignals = tuple(getattr(signal, name) for name in ("SIGPIPE", "SIGXFSZ") if hasattr(signal, name))
+
+
+def signal_group(pgid, sig):
+    try:
+        os.killpg(pgid, sig)
+    except (ProcessLookupError, PermissionError):
+        pass
+
+
+def exit_code(waitStatus):
+    if os.WIFSIGNALED(waitStatus):
+        return -os.WTERMSIG(waitStatus)
+    return os.WEXITSTATUS(waitStatus)
+
+
+def _register(proc):
+    with _lock:
+        _groups.add(proc.pid)
+        closed = _closed
+    if closed:
+        signal_group(proc.pid, signal.SIGKILL)
+        proc.wait()
+        release(proc)
+        raise KeyboardInterrupt
+    return proc
+
+
+def spawn(args, **kwargs):
+    if _closed:
+        raise KeyboardInterrupt
+    return _register(Popen(args, start_new_session = True, **kwargs))
+
+
+class Spawned(object):
+    __slots__ = ("args", "pid", "returncode")
+
+    def __init__(self, args, pid):
+        self.args = args
+        self.pid = pid
+        self.returncode = None
+
+    def poll(self):
+        if self.returncode is None:
+            pid, waitStatus = os.waitpid(self.pid, os.WNOHANG)
+            if pid != 0:
+                self.returncode = exit_code(waitStatus)
+        return self.returncode
+
+    def wait(self, timeout = None):
+        if timeout is None:
+            if self.returncode is None:
+                _, waitStatus = os.waitpid(self.pid, 0)
+                self.returncode = exit_code(waitStatus)
+            return self.returncode
+
+        deadline = time.monotonic() + timeout
+        delay = 0.0005
+        while self.poll() is None:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise TimeoutExpired(self.args, timeout)
+            time.sleep(min(delay, remaining))
+            delay = min(delay * 2, 0.05)
+        return self.returncode
+
+
+def _fd(value):
+    global _devnull
+    if value == DEVNULL:
+        if _devnull is None:
+            _devnull = os.open(os.devnull, os.O_RDWR)
+        return _devnull
+    return value
+
+
+def _spawn(args, stdin, stdout, stderr):
+    global _environment
+    if not hasattr(os, "posix_spawnp"):
+        return spawn(args, stdin = stdin, stdout = stdout, stderr = stderr)
+    if _closed:
+        raise KeyboardInterrupt
+    fileActions = []
+    for target, fd in ((0, stdin), (1, stdout), (2, stderr)):
+        fd = _fd(fd)
+        if fd is not None:
+            fileActions.append((os.POSIX_SPAWN_DUP2, fd, target))
+    if _environment is None:
+        _environment = dict(os.environ)
+    pid = os.posix_spawnp(args[0], args, _environment, file_actions = fileActions, setsid = True, setsigdef = _restoredSignals)
+    return _register(Spawned(args, pid))
+
+
+def launch(args, stdin = None, stdout = None, stderr = None, stopped = False):
+    if isinstance(args, str):
+        args = [args]
+    if not stopped:
+        return _spawn(args, stdin, stdout, stderr)
+
+    proc = _spawn(list(_stopper) + list(args), stdin, stdout, stderr)
+    _, waitStatus = os.waitpid(proc.pid, os.WUNTRACED)
+    if not os.WIFSTOPPED(waitStatus):
+        proc.returncode = exit_code(waitStatus)
+        release(proc)
+        raise ChildProcessError("{} exited before it was started".format(args[0]))
+    return proc
+
+
+def resume(proc):
+    os.kill(proc.pid, signal.SIGCONT)
+
+
+def release(proc):
+    signal_group(proc.pid, signal.SIGKILL)
+    with _lock:
+        _groups.discard(proc.pid)
+
+
+def terminate(proc):
+    if proc.poll() is None:
+        signal_group(proc.pid, signal.SIGTERM)
+        try:
+            proc.wait(timeout = killGrace)
+        except TimeoutExpired:
+            signal_group(proc.pid, signal.SIGKILL)
+            proc.wait()
+    release(proc)
+
+
+def wait(proc, timeout = None):
+    watchdog = Watchdog(proc, timeout)
+    try:
+        proc.wait()
+    except BaseException:
+        watchdog.kill()
+        proc.wait()
+        raise
+    finally:
+        watchdog.done()
+    if watchdog.expired:
+        raise TimeoutExpired(proc.args, timeout)
+    return proc.returncode
+
+
+def call(args, timeout = None, stdin = None, stdout = None, stderr = None):
+    return wait(launch(args, stdin = stdin, stdout = stdout, stderr = stderr), timeout)
+
+
+def communicate(args, input = None, timeout = None, stdout = None, stderr = None):
+    readEnd, writeEnd = os.pipe()
+    try:
+        proc = launch(args, stdin = readEnd, stdout = stdout, stderr = stderr)
+    except BaseException:
+        os.close(writeEnd)
+        raise
+    finally:
+        os.close(readEnd)
+
+    watchdog = Watchdog(proc, timeout)
+    try:
+        view = memoryview(input or b"")
+        try:
+            while len(view) > 0:
+                view = view[os.write(writeEnd, view):]
+        except BrokenPipeError:
+            pass
+        os.close(writeEnd)
+        writeEnd = None
+        proc.wait()
+    except BaseException:
+        watchdog.kill()
+        proc.wait()
+        raise
+    finally:
+        if writeEnd is not None:
+            os.close(writeEnd)
+        watchdog.done()
+    if watchdog.expired:
+        raise TimeoutExpired(proc.args, timeout)
+    return proc.returncode
+
+
+def write_all(fd, data):
+    view = memoryview(data)
+    while len(view) > 0:
+        view = view[os.write(fd, view):]
+
+
+class CappedOutput(object):
+
+    def __init__(self, consume, limit):
+        self.consume = consume
+        self.limit = limit
+        self.size = 0
+        self.exceeded = False
+
+    def write(self, chunk):
+        self.size += len(chunk)
+        if self.size > self.limit:
+            self.exceeded = True
+            allowed = len(chunk) - (self.size - self.limit)
+            if allowed > 0:
+                self.consume(chunk[:allowed])
+            return False
+        return self.consume(chunk)
+
+
+def exchange(input, writeFd, readFd, consume):
+    view = memoryview(input)
+    selector = selectors.DefaultSelector()
+    try:
+        if len(view) > 0:
+            os.set_blocking(writeFd, False)
+            selector.register(writeFd, selectors.EVENT_WRITE)
+        elif writeFd is not None:
+            os.close(writeFd)
+            writeFd = None
+        selector.register(readFd, selectors.EVENT_READ)
+
+        while True:
+            for key, _ in selector.select():
+                if key.fd == readFd:
+                    chunk = os.read(readFd, readSize)
+                    if not chunk:
+                        return True
+                    if consume(chunk) is False:
+                        return False
+                else:
+                    try:
+                        view = view[os.write(writeFd, view[:readSize]):]
+                    except BrokenPipeError:
+                        view = view[:0]
+                    if len(view) == 0:
+                        selector.unregister(writeFd)
+                        os.close(writeFd)
+                        writeFd = None
+    finally:
+        selector.close()
+        if writeFd is not None:
+            os.close(writeFd)
+        os.close(readFd)
+
+
+def capture(args, input = b"", timeout = None, stderr = None):
+    inRead, inWrite = os.pipe()
+    outRead, outWrite = os.pipe()
+    try:
+        proc = launch(args, stdin = inRead, stdout = outWrite, stderr = stderr)
+    except BaseException:
+        os.close(inWrite)
+        os.close(outRead)
+        raise
+    finally:
+        os.close(inRead)
+        os.close(outWrite)
+
+    chunks = []
+    watchdog = Watchdog(proc, timeout)
+    try:
+        exchange(input, inWrite, outRead, chunks.append)
+        proc.wait()
+    except BaseException:
+        watchdog.kill()
+        proc.wait()
+        raise
+    finally:
+        watchdog.done()
+    if watchdog.expired:
+        raise TimeoutExpired(proc.args, timeout)
+    return proc.returncode, b"".join(chunks)
+
+
+def closed():
+    return _closed
+
+
+class TailReader(object):
+
+    def __init__(self, fd, size = 4096):
+        self.fd = fd
+        self.size = size
+        self.data = b""
+        self.thread = Thread(target = self._read, daemon = True)
+        self.thread.start()
+
+    def _read(self):
+        try:
+            while True:
+                chunk = os.read(self.fd, readSize)
+                if not chunk:
+                    break
+                self.data = (self.data + chunk)[-self.size:]
+        finally:
+            os.close(self.fd)
+
+    def tail(self):
+        self.thread.join(killGrace)
+        return self.data
+
+
+def kill_all():
+    global _closed
+    with _lock:
+        _closed = True
+        groups = list(_groups)
+        _groups.clear()
+    for pgid in groups:
+        signal_group(pgid, signal.SIGKILL)
+
+
+class Timers(object):
+
+    def __init__(self):
+        self.condition = Condition()
+        self.heap = []
+        self.counter = itertools.count()
+        self.thread = None
+
+    def schedule(self, delay, callback):
+        entry = [time.monotonic() + delay, next(self.counter), callback]
+        with self.condition:
+            heapq.heappush(self.heap, entry)
+            if self.thread is None:
+                self.thread = Thread(target = self._loop, daemon = True)
+                self.thread.start()
+            if self.heap[0] is entry:
+                self.condition.notify()
+        return entry
+
+    def cancel(self, entry):
+        entry[2] = None
+
+    def _loop(self):
+        while True:
+            with self.condition:
+                while len(self.heap) == 0:
+                    self.condition.wait()
+                deadline, _, callback = self.heap[0]
+                if callback is not None:
+                    remaining = deadline - time.monotonic()
+                    if remaining > 0:
+                        self.condition.wait(remaining)
+                        continue
+                heapq.heappop(self.heap)
+            if callback is not None:
+                callback()
+
+
+_timers = Timers()
+
+
+def schedule(delay, callback):
+    return _timers.schedule(delay, callback)
+
+
+def cancel(timer):
+    _timers.cancel(timer)
+
+
+class Watchdog(object):
+
+    def __init__(self, proc, timeout):
+        self.proc = proc
+        self.lock = Lock()
+        self.reaped = False
+        self.expired = False
+        self.timer = None
+        if timeout is not None:
+            self.timer = _timers.schedule(timeout, self._expire)
+
+    def _expire(self):
+        with self.lock:
+            if self.reaped:
+                return
+            self.expired = True
+            signal_group(self.proc.pid, signal.SIGTERM)
+        self.timer = _timers.schedule(killGrace, self.kill)
+
+    def kill(self):
+        with self.lock:
+            if not self.reaped:
+                signal_group(self.proc.pid, signal.SIGKILL)
+
+    def done(self):
+        with self.lock:
+            self.reaped = True
+        if self.timer is not None:
+            _timers.cancel(self.timer)
+        release(self.proc)
@@ -1,6 +1,9 @@
+import os
+
 tmp_counter = 0
 tmp_list = []
 tmp_prefix = ".hz_tmp"
+ram_fds = []
 
 
 def create(name = None):
@@ -18,9 +21,26 @@ def create(name = None):
             raise Exception("Temporary file with the same name has been created")
 
 
+def create_ram():
+    global tmp_counter
+
+    name = tmp_prefix + str(tmp_counter)
+    if hasattr(os, "memfd_create") and os.path.isdir("/proc/self/fd"):
+        tmp_counter += 1
+        fd = os.memfd_create(name)
+        ram_fds.append(fd)
+        return "/proc/{}/fd/{}".format(os.getpid(), fd)
+    if os.path.isdir("/dev/shm") and os.access("/dev/shm", os.W_OK):
+        tmp_counter += 1
+        return create("/dev/shm/{}.{}".format(name, os.getpid()))
+    return create()
+
+
 def clear_up():
     global tmp_list
-    import os
     for file_name in tmp_list:
         if os.path.isfile(file_name):
             os.remove(file_name)
+    for fd in ram_fds:
+        os.close(fd)
+    ram_fds.clear()
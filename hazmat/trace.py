@@ -0,0 +1,89 @@
+import json
+import os
+import threading
+import time
+
+_path = None
+_events = None
+_threads = {}
+_lock = threading.Lock()
+
+
+class _NullSpan(object):
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+def _thread_id():
+    ident = threading.get_ident()
+    tid = _threads.get(ident)
+    if tid is None:
+        with _lock:
+            tid = _threads.setdefault(ident, len(_threads))
+    return tid
+
+
+class Span(object):
+    __slots__ = ("name", "args", "start")
+
+    def __init__(self, name, args):
+        self.name = name
+        self.args = args
+        self.start = 0
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        end = time.perf_counter_ns()
+        event = {"name": self.name, "ph": "X", "pid": 0, "tid": _thread_id(), "ts": self.start / 1000, "dur": (end - self.start) / 1000}
+        if self.args:
+            event["args"] = self.args
+        if _events is not None:
+            _events.append(event)
+        return False
+
+
+def enabled():
+    return _events is not None
+
+
+def start(path):
+    global _path, _events
+    if path is None:
+        return
+    _path = path
+    _events = []
+    _threads.clear()
+    _thread_id()
+
+
+def span(name, **args):
+    if _events is None:
+        return _NULL_SPAN
+    return Span(name, args)
+
+
+def save():
+    global _path, _events
+    if _events is None:
+        return
+    events = list(_events)
+    for ident, tid in sorted(_threads.items(), key = lambda item: item[1]):
+        name = "main" if tid == 0 else "worker {}".format(tid)
+        events.append({"name": "thread_name", "ph": "M", "pid": 0, "tid": tid, "args": {"name": name}})
+
+    part = _path + ".part"
+    with open(part, "w") as file:
+        json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, file)
+    os.replace(part, _path)
+    _path = None
+    _events = None
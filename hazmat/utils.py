@@ -1,3 +1,5 @@
+import argparse
+import hashlib
 import os
 
 
@@ -10,6 +12,20 @@ def normalize_dir(path):
     return path
 
 
+def positive_int(value):
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError("expected a positive integer, got {}".format(value))
+    return number
+
+
+def non_negative_int(value):
+    number = int(value)
+    if number < 0:
+        raise argparse.ArgumentTypeError("expected a non-negative integer, got {}".format(value))
+    return number
+
+
 def printFile(path):
     with open(path, 'r') as file:
         print((file.read()).strip("\n"))
@@ -33,3 +49,18 @@ def get_parrarel_tests(inTestDir, outTestDir):
                     list.append((inTest, outTest))
 
     return list
+
+
+def directory_digest(directory = None):
+    if directory is None:
+        directory = os.getcwd()
+    return hashlib.sha256(os.path.realpath(directory).encode()).hexdigest()[:32]
+
+
+def file_digest(path, hasher = None):
+    if hasher is None:
+        hasher = hashlib.sha256()
+    with open(path, "rb") as file:
+        for chunk in iter(lambda: file.read(1 << 20), b""):
+            hasher.update(chunk)
+    return hasher.hexdigest()
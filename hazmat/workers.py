@@ -0,0 +1,76 @@
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from queue import Queue
+from . import tmp_utils
+
+_local = threading.local()
+
+
+def worker_id():
+    return getattr(_local, "workerId", 0)
+
+
+class WorkerPool(object):
+
+    def __init__(self, jobs = 1, tmpPerWorker = 1, ram = False):
+        self.jobs = max(1, jobs)
+        self.tmpFiles = Queue()
+        create = tmp_utils.create_ram if ram else tmp_utils.create
+        for workerId in range(self.jobs):
+            self.tmpFiles.put((workerId, [create() for _ in range(tmpPerWorker)]))
+
+        self.executor = None
+        if self.jobs > 1:
+            self.executor = ThreadPoolExecutor(max_workers = self.jobs)
+
+    def _call(self, func, item):
+        workerId, tmps = self.tmpFiles.get()
+        _local.workerId = workerId
+        try:
+            return func(item, *tmps)
+        finally:
+            self.tmpFiles.put((workerId, tmps))
+
+    def imap(self, func, items, order = None):
+        if self.executor is None:
+            for item in items:
+                yield self._call(func, item)
+            return
+
+        if order is not None:
+            futures = [None] * len(items)
+            try:
+                for index in order:
+                    futures[index] = self.executor.submit(self._call, func, items[index])
+                for future in futures:
+                    yield future.result()
+            finally:
+                for future in futures:
+                    if future is not None:
+                        future.cancel()
+            return
+
+        pending = deque()
+        items = iter(items)
+        try:
+            for item in items:
+                pending.append(self.executor.submit(self._call, func, item))
+                if len(pending) >= 2 * self.jobs:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+        finally:
+            for future in pending:
+                future.cancel()
+
+    def shutdown(self):
+        if self.executor is not None:
+            self.executor.shutdown(wait = True)
+            self.executor = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.shutdown()
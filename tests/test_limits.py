@@ -0,0 +1,65 @@
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+WORK_DIR = tempfile.mkdtemp(prefix = "hazmat-test-")
+os.makedirs(os.path.join(WORK_DIR, ".config", "hazmat"))
+with open(os.path.join(WORK_DIR, ".config", "hazmat", "hazmat.json"), "w") as configFile:
+    json.dump({"languages": [{"name": "Shell", "extension": ".sh"}]}, configFile)
+os.environ["HOME"] = WORK_DIR
+
+from hazmat.models import Solution
+from hazmat.models.enums import RunStatus
+from hazmat.models.limits import Limits
+
+megabyte = 2 ** 20
+
+
+def allocating(name, megabytes):
+    path = os.path.join(WORK_DIR, name)
+    with open(path, "w") as file:
+        file.write("#!/bin/sh\nexec python3 -c \"b = b'x' * ({} << 20)\"\n".format(megabytes))
+    os.chmod(path, 0o755)
+    return path
+
+
+class LimitsTest(unittest.TestCase):
+
+    def setUp(self):
+        self.inFile = os.path.join(WORK_DIR, "empty.in")
+        self.outFile = os.path.join(WORK_DIR, "out")
+        open(self.inFile, "w").close()
+
+    def run_limited(self, megabytes, memory = None):
+        limits = Limits(memory = None if memory is None else memory * megabyte)
+        solution = Solution(allocating("alloc{}.sh".format(megabytes), megabytes), timeout = 10, limits = limits)
+        return solution.run(self.inFile, self.outFile)
+
+    def test_over_limit_allocation_is_mle(self):
+        status, _ = self.run_limited(800, memory = 256)
+        self.assertEqual(status, RunStatus.MLE)
+
+    def test_over_limit_allocation_is_mle_with_rlimit(self):
+        with mock.patch.object(Limits, "cgroup", return_value = None):
+            status, _ = self.run_limited(800, memory = 256)
+        self.assertEqual(status, RunStatus.MLE)
+
+    def test_allocation_within_limit_is_ok(self):
+        with mock.patch.object(Limits, "cgroup", return_value = None):
+            status, _ = self.run_limited(16, memory = 256)
+        self.assertEqual(status, RunStatus.OK)
+
+    def test_peak_is_reported(self):
+        status, usage = self.run_limited(0, memory = 256)
+        self.assertEqual(status, RunStatus.OK)
+        self.assertIsNotNone(usage.maxRss)
+
+        status, usage = self.run_limited(64)
+        self.assertEqual(status, RunStatus.OK)
+        self.assertGreaterEqual(usage.maxRss, 64 * megabyte)
+
+
+if __name__ == "__main__":
+    unittest.main()